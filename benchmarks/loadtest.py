@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# Load test for the pricing service (loancore.service).
+#
+#   python benchmarks/loadtest.py --spawn                      start a local service and test it
+#   python benchmarks/loadtest.py --url http://127.0.0.1:8000  test a running instance
+#   python benchmarks/loadtest.py --spawn --endpoint term --concurrency 128 --requests 20000
+#
+# Each connection is a keep-alive HTTP/1.1 client on plain asyncio streams, so
+# the test needs nothing beyond the standard library. Requests carry varied
+# loans from a fixed seed. Reports latency percentiles, requests per second
+# and, from /metrics, how many requests each engine call priced on average.
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _bodies(endpoint, count, seed=7):
+    # Request bodies for the endpoint, varied so that nothing is cached
+    rng = np.random.default_rng(seed)
+    principals = rng.uniform(20000, 800000, count).round(2)
+    rates = rng.uniform(2.0, 9.0, count).round(3)
+    terms = rng.choice([60, 120, 180, 240, 360], count)
+    extras = rng.choice([0, 100, 250, 500], count)
+    bodies = []
+    for principal, rate, term, extra in zip(principals.tolist(), rates.tolist(), terms.tolist(), extras.tolist()):
+        loan = {"principal": principal, "annual_rate": rate, "extra_payment": extra}
+        if endpoint == "term":
+            # Comfortably above the monthly interest
+            loan["monthly_payment"] = round(principal * (rate / 1200 + 1 / term), 2)
+        else:
+            loan["term_months"] = term
+        bodies.append(json.dumps(loan).encode("utf-8"))
+    return bodies
+
+
+async def _request(reader, writer, method, path, host, body=b""):
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _fetch(host, port, method, path, body=b""):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return await _request(reader, writer, method, path, f"{host}:{port}", body)
+    finally:
+        writer.close()
+
+
+async def _worker(host, port, path, bodies, next_index, latencies, errors):
+    # One keep-alive connection sending requests until the bodies run out
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            index = next_index()
+            if index is None:
+                return
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, "POST", path, f"{host}:{port}", bodies[index])
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def _batch_counts(host, port, endpoint):
+    # (requests, batches) for the endpoint from the service's /metrics
+    _, text = await _fetch(host, port, "GET", "/metrics")
+    label = f'{{endpoint="{endpoint.replace("-", "_")}"}}'
+    counts = {}
+    for line in text.decode("utf-8").splitlines():
+        for metric in ("loancore_service_requests_total", "loancore_service_batches_total"):
+            if line.startswith(metric + label):
+                counts[metric] = float(line.split()[-1])
+    return counts.get("loancore_service_requests_total", 0), counts.get("loancore_service_batches_total", 0)
+
+
+async def run(host, port, endpoint, requests, concurrency, warmup=200):
+    path = f"/{endpoint}"
+    bodies = _bodies(endpoint, requests + warmup)
+
+    def counter(limit, offset=0):
+        position = iter(range(offset, offset + limit))
+        return lambda: next(position, None)
+
+    # Warm up (imports, first engine calls) before measuring
+    warmup_index = counter(warmup)
+    await asyncio.gather(*(_worker(host, port, path, bodies, warmup_index, [], []) for _ in range(concurrency)))
+
+    before = await _batch_counts(host, port, endpoint)
+    latencies, errors = [], []
+    next_index = counter(requests, warmup)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _worker(host, port, path, bodies, next_index, latencies, errors) for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    after = await _batch_counts(host, port, endpoint)
+
+    batches = after[1] - before[1]
+    latencies_ms = sorted(seconds * 1e3 for seconds in latencies)
+    return {
+        "endpoint": endpoint,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies_ms, 50),
+        "p90_ms": _percentile(latencies_ms, 90),
+        "p99_ms": _percentile(latencies_ms, 99),
+        "max_ms": latencies_ms[-1],
+        "mean_ms": statistics.fmean(latencies_ms),
+        "mean_batch_size": (after[0] - before[0]) / batches if batches else None,
+    }
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _spawn(port, max_batch, max_delay_ms):
+    # Start python -m loancore.service and wait until it answers /healthz
+    process = subprocess.Popen(
+        [sys.executable, "-m", "loancore.service", "--port", str(port),
+         "--max-batch", str(max_batch), "--max-delay-ms", str(max_delay_ms)],
+        cwd=ROOT,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The service exited with status {process.returncode}.")
+        try:
+            status, _ = asyncio.run(_fetch("127.0.0.1", port, "GET", "/healthz"))
+            if status == 200:
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("The service did not start within 30 seconds.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the loancore pricing service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="service to test (default: %(default)s)")
+    parser.add_argument("--spawn", action="store_true", help="start a local service on a free port for the test")
+    parser.add_argument("--endpoint", choices=("payment", "term", "interest-saved", "schedule"), default="payment")
+    parser.add_argument("--requests", type=int, default=5000, help="measured requests (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=64, help="open connections (default: %(default)s)")
+    parser.add_argument("--max-batch", type=int, default=256, help="with --spawn: the service's --max-batch")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0, help="with --spawn: the service's --max-delay-ms")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.spawn:
+        host, port = "127.0.0.1", _free_port()
+        process = _spawn(port, args.max_batch, args.max_delay_ms)
+    else:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+
+    try:
+        results = asyncio.run(run(host, port, args.endpoint, args.requests, args.concurrency))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    batch_size = results["mean_batch_size"]
+    print(f"{results['endpoint']}: {results['requests']:,} requests, {results['errors']} errors, "
+          f"concurrency {results['concurrency']}")
+    print(f"  throughput  {results['requests_per_second']:10,.0f} req/s")
+    print(f"  latency     p50 {results['p50_ms']:.2f} ms   p90 {results['p90_ms']:.2f} ms   "
+          f"p99 {results['p99_ms']:.2f} ms   max {results['max_ms']:.2f} ms")
+    if batch_size:
+        print(f"  batching    {batch_size:.1f} requests per engine call")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+    return 1 if results["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
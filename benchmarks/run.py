@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# Benchmarks for the amortization engine and chart builders.
+#
+#   python benchmarks/run.py                  compare against baselines.json
+#   python benchmarks/run.py --save           record the current results as baselines
+#   python benchmarks/run.py -k single_loan   only benchmarks whose name contains the text
+#
+# Benchmarks follow the asv naming: time_* functions return the callable to
+# time, track_* functions return a number to record (bytes, rows per second).
+# A timing is the median of several repeats, each looping long enough to be
+# measurable. A timing or tracked size above its baseline times the threshold
+# is a regression, and the run exits with status 1. Everything runs offline
+# on fixed inputs.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import date
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import loancore  # noqa: E402
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+START_DATE = date(2024, 1, 1)
+PRINCIPAL = 350000.0
+RATE = 6.5
+
+# track_* results where larger is better; everything else regresses upward
+HIGHER_IS_BETTER = ("track_batch_summary_loans_per_second",)
+
+
+def _portfolio(n, seed=7):
+    rng = np.random.default_rng(seed)
+    principals = rng.uniform(20000, 800000, n).round(2)
+    rates = rng.uniform(2.0, 9.0, n).round(3)
+    terms = rng.choice([60, 120, 180, 240, 360], n)
+    return principals, rates, loancore.solve_payment(principals, rates, terms)
+
+
+def _schedule(months=360):
+    payment = loancore.solve_payment(PRINCIPAL, RATE, months)
+    return loancore.calculate_amortization_schedule(PRINCIPAL, RATE, payment, 0, START_DATE)
+
+
+# Single loan latency across term lengths
+
+def _single_loan(months):
+    payment = loancore.solve_payment(PRINCIPAL, RATE, months)
+    return lambda: loancore.calculate_amortization_schedule(PRINCIPAL, RATE, payment, 0, START_DATE)
+
+
+def time_single_loan_12():
+    return _single_loan(12)
+
+
+def time_single_loan_60():
+    return _single_loan(60)
+
+
+def time_single_loan_180():
+    return _single_loan(180)
+
+
+def time_single_loan_360():
+    return _single_loan(360)
+
+
+def time_single_loan_480():
+    return _single_loan(480)
+
+
+def time_single_loan_reference_360():
+    payment = loancore.solve_payment(PRINCIPAL, RATE, 360)
+    return lambda: loancore.calculate_amortization_schedule_reference(PRINCIPAL, RATE, payment, 0, START_DATE)
+
+
+def time_single_loan_arm_360():
+    payment = loancore.solve_payment(PRINCIPAL, RATE, 360)
+    rates = loancore.arm_rate_schedule(RATE + 1.5, fixed_months=60)
+    return lambda: loancore.calculate_amortization_schedule(PRINCIPAL, RATE, payment, 0, START_DATE, rates)
+
+
+def time_single_loan_cents_360():
+    payment = loancore.solve_payment(PRINCIPAL, RATE, 360)
+    return lambda: loancore.calculate_amortization_schedule_cents(PRINCIPAL, RATE, payment, 0, START_DATE)
+
+
+def time_solve_term():
+    payment = loancore.solve_payment(PRINCIPAL, RATE, 360)
+    return lambda: loancore.solve_term(PRINCIPAL, RATE, payment + 250)
+
+
+# Batch throughput
+
+def time_batch_summary_10k():
+    principals, rates, payments = _portfolio(10_000)
+    return lambda: loancore.calculate_portfolio_amortization(principals, rates, payments, 0, START_DATE)
+
+
+def time_batch_schedule_1k():
+    principals, rates, payments = _portfolio(1000)
+    return lambda: loancore.calculate_portfolio_amortization(
+        principals, rates, payments, 0, START_DATE, include_schedule=True
+    )
+
+
+def time_batch_cents_1k():
+    principals, rates, payments = _portfolio(1000)
+    return lambda: loancore.amortize_cents(principals, rates, payments, include_schedule=False)
+
+
+def track_batch_summary_loans_per_second():
+    principals, rates, payments = _portfolio(100_000)
+    seconds = _measure(lambda: loancore.calculate_portfolio_amortization(principals, rates, payments, 0, START_DATE))
+    return len(principals) / seconds
+
+
+# Multi-debt payoff planning for a 20-debt household
+
+def _household(n=20, seed=11):
+    rng = np.random.default_rng(seed)
+    balances = rng.uniform(500, 40000, n).round(2)
+    rates = rng.uniform(0.0, 28.0, n).round(2)
+    minimums = np.maximum(balances * 0.02, 25).round(2)
+    return balances, rates, minimums, minimums.sum() + 800
+
+
+def time_payoff_plan_20():
+    balances, rates, minimums, budget = _household()
+    return lambda: loancore.plan_payoff(balances, rates, minimums, budget, "avalanche", start_date=START_DATE)
+
+
+def time_payoff_optimizer_20():
+    balances, rates, minimums, budget = _household()
+    return lambda: loancore.optimize_payoff_order(balances, rates, minimums, budget, start_date=START_DATE)
+
+
+# Schedule to DataFrame conversion
+
+def time_frame_from_arrays_360():
+    from loancore.schedule import _schedule_frame
+
+    arrays = loancore.amortize_arrays(PRINCIPAL, RATE, loancore.solve_payment(PRINCIPAL, RATE, 360))
+    payment_numbers = np.arange(1, arrays["months"] + 1)
+    return lambda: _schedule_frame(arrays, payment_numbers, START_DATE)
+
+
+def time_compact_to_pandas_360():
+    schedule = loancore.compact_schedule(PRINCIPAL, RATE, loancore.solve_payment(PRINCIPAL, RATE, 360), 0, START_DATE)
+    return schedule.to_pandas
+
+
+def time_payment_dates_100k():
+    payment_numbers = np.arange(1, 100_001)
+    return lambda: loancore.payment_dates(START_DATE, payment_numbers)
+
+
+# Styler formatting, the way the schedule table used to be rendered
+
+def time_styler_format_360():
+    df = _schedule()[0]
+    money = {column: "${:,.2f}" for column in ("Total Payment", "Interest", "Principal", "Remaining Balance")}
+    return lambda: df.style.format(money).to_html()
+
+
+# Figure building and JSON payload size
+
+def _figures():
+    df = _schedule()[0]
+    total_interest = float(df["Interest"].sum())
+    return {
+        "amortization": loancore.plot_amortization(df, "mortgage"),
+        "payment_breakdown": loancore.plot_payment_breakdown(PRINCIPAL, total_interest),
+        "monthly_breakdown": loancore.plot_monthly_breakdown(float(df["Total Payment"].iloc[0])),
+    }
+
+
+def time_plot_amortization_360():
+    df = _schedule()[0]
+    return lambda: loancore.plot_amortization(df, "mortgage")
+
+
+def time_plot_payment_breakdown():
+    return lambda: loancore.plot_payment_breakdown(PRINCIPAL, 400000.0)
+
+
+def time_figure_to_json():
+    figures = list(_figures().values())
+    return lambda: [figure.to_json() for figure in figures]
+
+
+def track_figure_json_bytes_amortization():
+    return len(_figures()["amortization"].to_json())
+
+
+def track_figure_json_bytes_payment_breakdown():
+    return len(_figures()["payment_breakdown"].to_json())
+
+
+def track_figure_json_bytes_monthly_breakdown():
+    return len(_figures()["monthly_breakdown"].to_json())
+
+
+def _measure(func, repeat=5, min_time=0.05):
+    # Median seconds per call: each repeat loops until it runs at least min_time
+    func()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return statistics.median(samples)
+
+
+def _benchmarks(pattern=None):
+    names = sorted(n for n, f in globals().items() if n.startswith(("time_", "track_")) and callable(f))
+    return [n for n in names if not pattern or pattern in n]
+
+
+def _environment():
+    import pandas
+    import plotly
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "pandas": pandas.__version__,
+        "plotly": plotly.__version__,
+    }
+
+
+def _format(name, value):
+    if name.startswith("time_"):
+        return f"{value * 1e3:10.3f} ms"
+    return f"{value:13,.0f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the loancore benchmarks.")
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--save", action="store_true", help="write the results to the baselines file")
+    parser.add_argument("--baselines", default=BASELINES, help="baselines JSON file (default: %(default)s)")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="regression when a result is worse than baseline by this factor (default: %(default)s)")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines, encoding="utf-8") as handle:
+            baselines = json.load(handle).get("results", {})
+
+    results = {}
+    regressions = []
+    for name in _benchmarks(args.pattern):
+        bench = globals()[name]
+        value = _measure(bench()) if name.startswith("time_") else float(bench())
+        results[name] = value
+
+        baseline = baselines.get(name)
+        status = ""
+        if baseline:
+            ratio = baseline / value if name in HIGHER_IS_BETTER else value / baseline
+            status = f"{ratio:6.2f}x"
+            if ratio > args.threshold:
+                status += "  REGRESSION"
+                regressions.append(name)
+        print(f"{name:45s} {_format(name, value)}  {status}", flush=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump({"environment": _environment(), "results": results}, handle, indent=2, sort_keys=True)
+
+    if args.save:
+        if args.pattern and os.path.exists(args.baselines):
+            # A filtered run only replaces the baselines it measured
+            results = {**baselines, **results}
+        with open(args.baselines, "w", encoding="utf-8") as handle:
+            json.dump({"environment": _environment(), "results": results}, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"Saved {len(results)} baselines to {args.baselines}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold}x: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
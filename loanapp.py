@@ -1,9 +1,42 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
-from datetime import date
 import numpy as np
+from datetime import date
+from loancore import (
+    COLORS,
+    PrepaymentEvents,
+    ScheduleCache,
+    arm_rate_schedule,
+    cached_amortization_schedule,
+    cached_compact_schedule,
+    cached_figure,
+    cached_incremental_schedule,
+    cached_plot_amortization,
+    cached_scenario_trace,
+    chart_template,
+    csv_download,
+    extra_payment_rate_grid,
+    extra_payment_sweep,
+    get_caches,
+    iter_schedule_chunks,
+    payoff_balances,
+    plan_payoff,
+    plot_balance_fan,
+    plot_comparison,
+    plot_extra_payment_sweep,
+    plot_monthly_breakdown,
+    plot_payment_breakdown,
+    plot_payoff_plan,
+    plot_savings_heatmap,
+    plot_scenario_balances,
+    price_loans,
+    schedule_cache_key,
+    solve_payment,
+    simulate_rate_paths,
+    solve_term,
+    telemetry,
+)
 
 # Set page configuration for a polished look
 st.set_page_config(
@@ -214,260 +247,298 @@ icons = {
     "education": "🎓",
     "payment": "💰",
     "term": "⌛",
-    "interest": "💹"
+    "interest": "💹",
+    "compare": "📋",
+    "debt": "🧾"
 }
 
-def calculate_amortization_schedule(principal, annual_rate, monthly_payment, extra_payment=0, start_date=None):
-    monthly_rate = annual_rate / 100 / 12
-    balance = principal
-    schedule = []
-    total_interest = 0
-    month = 0
-    current_date = start_date if start_date else date.today()
-
-    while balance > 0:
-        interest = balance * monthly_rate
-        total_interest += interest
-        principal_payment = monthly_payment + extra_payment - interest
-
-        if principal_payment > balance:
-            principal_payment = balance
-            monthly_payment = interest + principal_payment
-
-        balance -= principal_payment
-        month += 1
-
-        # Calculate date for this payment
-        payment_date = current_date.replace(month=((current_date.month - 1 + month) % 12) + 1,
-                                           year=current_date.year + ((current_date.month - 1 + month) // 12))
-
-        schedule.append([
-            month,
-            payment_date.strftime("%b %Y"),
-            round(monthly_payment + extra_payment, 2),
-            round(interest, 2),
-            round(principal_payment, 2),
-            round(balance, 2)
-        ])
-
-    df = pd.DataFrame(
-        schedule,
-        columns=["Payment #", "Date", "Total Payment", "Interest", "Principal", "Remaining Balance"]
+def savings_sweep_figures(principal, annual_rate, monthly_payment, num_payments, max_extra):
+    # Savings curve over extra payments in $25 steps, and a heatmap over the
+    # same extras and rates within two points of the current rate
+    extras = np.arange(0.0, max_extra + 25, 25)
+    sweep = extra_payment_sweep(principal, annual_rate, monthly_payment, extras)
+    rates = np.unique(np.clip(np.arange(annual_rate - 2, annual_rate + 2.001, 0.125), 0, None))
+    grid = extra_payment_rate_grid(principal, rates, extras, num_payments)
+    return plot_extra_payment_sweep(sweep), plot_savings_heatmap(grid)
+
+def rate_scenario_results(principal, annual_rate, monthly_payment, extra_payment, num_payments, loan_type,
+                          first_reset_years, volatility, lifetime_cap, prepayment_cpr):
+    # Fixed seed so the same inputs always show the same scenarios. Only runs
+    # on a figure cache miss, so the progress bar shows only while simulating.
+    result = simulate_rate_paths(
+        principal, annual_rate, monthly_payment, extra_payment,
+        n_paths=2000,
+        term_months=num_payments,
+        first_reset=first_reset_years * 12,
+        volatility=volatility,
+        lifetime_cap=lifetime_cap,
+        prepayment_cpr=prepayment_cpr / 100,
+        seed=2024,
+        # In-process: a worker pool would take longer to start than the run
+        workers=1,
+        progress=streamlit_progress("Simulating 2,000 rate paths...")
     )
-    return df, month, total_interest
-
-def plot_amortization(df, loan_type="mortgage"):
-    # Create a custom color scheme based on loan type
-    colors = {
-        "mortgage": {"balance": "#3b82f6", "interest": "#ef4444"},
-        "car": {"balance": "#10b981", "interest": "#f97316"},
-        "personal": {"balance": "#8b5cf6", "interest": "#f43f5e"},
-        "education": {"balance": "#06b6d4", "interest": "#a855f7"}
+    summary = {
+        "payoff": np.percentile(result["payoff_month"], [5, 50, 95]),
+        "interest": np.percentile(result["total_interest"], [5, 50, 95]),
     }
-
-    selected_colors = colors.get(loan_type, colors["mortgage"])
-
-    # Create the figure
-    fig = go.Figure()
-
-    # Add traces with improved styling
-    fig.add_trace(go.Scatter(
-        x=df["Payment #"],
-        y=df["Remaining Balance"],
-        name="Remaining Balance",
-        line=dict(color=selected_colors["balance"], width=4),
-        fill='tozeroy',
-        fillcolor=f"rgba({int(selected_colors['balance'][1:3], 16)}, {int(selected_colors['balance'][3:5], 16)}, {int(selected_colors['balance'][5:7], 16)}, 0.1)"
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=df["Payment #"],
-        y=df["Interest"].cumsum(),
-        name="Cumulative Interest",
-        line=dict(color=selected_colors["interest"], width=4),
-        fill='tozeroy',
-        fillcolor=f"rgba({int(selected_colors['interest'][1:3], 16)}, {int(selected_colors['interest'][3:5], 16)}, {int(selected_colors['interest'][5:7], 16)}, 0.1)"
-    ))
-
-    # Update layout with more professional styling
-    fig.update_layout(
-        title=dict(
-            text="Loan Amortization Visualization",
-            font=dict(family="Poppins, sans-serif", size=24, color="#1e3a8a"),
-            x=0.5,
-            xanchor='center'
-        ),
-        xaxis=dict(
-            title=dict(
-                text="Payment Number",
-                font=dict(family="Poppins, sans-serif", size=14, color="#64748b")
-            ),
-            showgrid=True,
-            gridcolor='rgba(220, 220, 220, 0.4)',
-            zeroline=False,
-            tickfont=dict(family="Poppins, sans-serif", size=12, color="#64748b")
-        ),
-        yaxis=dict(
-            title=dict(
-                text="Amount ($)",
-                font=dict(family="Poppins, sans-serif", size=14, color="#64748b")
-            ),
-            showgrid=True,
-            gridcolor='rgba(220, 220, 220, 0.4)',
-            zeroline=False,
-            tickfont=dict(family="Poppins, sans-serif", size=12, color="#64748b")
-        ),
-        legend=dict(
-            y=1.02,
-            x=1,
-            xanchor='right',
-            yanchor='bottom',
-            orientation='h',
-            font=dict(family="Poppins, sans-serif", size=14, color="#64748b")
-        ),
-        hovermode="x unified",
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        margin=dict(l=40, r=40, t=80, b=40),
-        height=500
+    return plot_balance_fan(result, loan_type), summary
+
+@st.fragment
+def rate_scenarios_view(principal, annual_rate, monthly_payment, extra_payment, num_payments, loan_type):
+    # Variable-rate Monte Carlo next to the fixed-rate chart; a fragment so that
+    # tuning the scenario inputs only reruns this section
+    if not st.toggle("Simulate variable-rate scenarios", key="rate_scenarios_show"):
+        return
+
+    col_reset, col_vol, col_cap, col_prepay = st.columns(4)
+    with col_reset:
+        first_reset_years = st.selectbox("First Reset (Years)", [1, 3, 5, 7, 10], index=2, key="rate_scenarios_reset")
+    with col_vol:
+        volatility = st.number_input("Rate Volatility (%/yr)", min_value=0.0, value=1.0, step=0.25, key="rate_scenarios_vol")
+    with col_cap:
+        lifetime_cap = st.number_input("Lifetime Cap (%)", min_value=0.0, value=5.0, step=0.5, key="rate_scenarios_cap")
+    with col_prepay:
+        prepayment_cpr = st.number_input("Prepayment (%/yr)", min_value=0.0, max_value=100.0, value=0.0, step=1.0,
+                                         key="rate_scenarios_cpr")
+
+    with telemetry.span("figure.rate_scenarios"):
+        fan_fig, summary = cached_figure(
+            rate_scenario_results, principal, annual_rate, monthly_payment, extra_payment, num_payments, loan_type,
+            first_reset_years, volatility, lifetime_cap, prepayment_cpr
+        )
+    with telemetry.span("render.rate_scenarios"):
+        st.plotly_chart(fan_fig, use_container_width=True, theme=None)
+
+    payoff_low, payoff_mid, payoff_high = summary["payoff"]
+    interest_low, interest_mid, interest_high = summary["interest"]
+    st.caption(
+        f"Payoff month (5th / 50th / 95th percentile): {payoff_low:.0f} / {payoff_mid:.0f} / {payoff_high:.0f}  ·  "
+        f"Total interest: ${interest_low:,.0f} / ${interest_mid:,.0f} / ${interest_high:,.0f}"
     )
 
-    # Add custom hover template
-    fig.update_traces(
-        hovertemplate="<b>Payment #%{x}</b><br>Amount: $%{y:,.2f}<extra></extra>"
-    )
+def streamlit_progress(text):
+    # Progress callback for long batch jobs, drawn as a Streamlit progress bar
+    # that is removed once the job is done
+    bar = st.progress(0.0, text=text)
+
+    def update(done, total):
+        if done >= total:
+            bar.empty()
+        else:
+            bar.progress(done / total, text=f"{text} ({done:,}/{total:,})")
+
+    return update
+
+# Calculations kept per session. A result is stored under the inputs it came
+# from, so a rerun with the same inputs (switching tabs, paging the schedule,
+# touching an unrelated widget) shows it again without another click or any
+# recomputation, while changing an input hides it until recalculated.
+SESSION_RESULTS_SIZE = 8
+
+def session_results():
+    # This session's results: a small LRU in session state
+    if "loan_results" not in st.session_state:
+        st.session_state["loan_results"] = ScheduleCache(maxsize=SESSION_RESULTS_SIZE)
+    return st.session_state["loan_results"]
+
+def calculation(key, clicked, compute):
+    # The result for these inputs: computed on the button click, then reused
+    # on every rerun until the inputs change. None until calculated.
+    results = session_results()
+    if clicked:
+        return results.get_or_compute(key, compute)
+    return results.get(key)
+
+def result_figure(result, name, build):
+    # Figures are kept with the result they plot, built on first display
+    figures = result["figures"]
+    if name not in figures:
+        figures[name] = build()
+    return figures[name]
+
+def payment_plan_results(principal, annual_rate, monthly_payment, extra_payment, start_date, rate_schedule):
+    with telemetry.span("schedule"):
+        schedule = cached_compact_schedule(principal, annual_rate, monthly_payment, extra_payment, start_date, rate_schedule)
+        normal_schedule = cached_compact_schedule(principal, annual_rate, monthly_payment, 0, start_date, rate_schedule)
+    return {
+        "months": len(schedule),
+        "total_interest": schedule.total_interest,
+        "normal_months": len(normal_schedule),
+        "normal_interest": normal_schedule.total_interest,
+        "figures": {},
+    }
 
-    return fig
-
-def plot_payment_breakdown(principal, total_interest):
-    labels = ['Principal', 'Interest']
-    values = [principal, total_interest]
-    colors = ['#3b82f6', '#ef4444']
-
-    fig = go.Figure(data=[go.Pie(
-        labels=labels,
-        values=values,
-        hole=.4,
-        textinfo='label+percent',
-        marker=dict(colors=colors),
-        textfont=dict(size=14, color='black')  # Ensure text is readable
-    )])
-
-    fig.update_layout(
-        title=dict(
-            text="Total Payment Breakdown",
-            font=dict(family="Poppins, sans-serif", size=20, color="#1e3a8a"),
-            x=0.5,
-            xanchor='center'
-        ),
-        legend=dict(
-            font=dict(family="Poppins, sans-serif", size=14, color="#64748b")
-        ),
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)"
+def interest_saved_results(principal, annual_rate, monthly_payment, extra_payment, events):
+    # The baseline is kept by the what-if engine, so a new extra payment only
+    # computes the accelerated path
+    with telemetry.span("savings"):
+        savings = cached_incremental_schedule(principal, annual_rate, monthly_payment).compare(
+            extra_payment, events=events
+        )
+    return {**savings, "figures": {}}
+
+def loan_term_results(principal, annual_rate, monthly_payment, extra_payment):
+    # Term and interest come from the closed form; the full schedule is only
+    # built where it is displayed
+    with telemetry.span("solve_term"):
+        months, total_interest = solve_term(principal, annual_rate, monthly_payment + extra_payment)
+    return {"months": months, "total_interest": total_interest, "figures": {}}
+
+def scenario_comparison_results(scenarios, start_date):
+    # Every scenario is priced in one batch call; the balance curves are
+    # cached per scenario, so adding one only builds that scenario's curve
+    with telemetry.span("compare"):
+        summary, priced = price_loans(scenarios, start_date)
+        traces = [
+            cached_scenario_trace(principal, annual_rate, payment, extra, start_date, str(name))
+            for name, principal, annual_rate, payment, extra in zip(
+                priced["loan_ids"], priced["principals"], priced["annual_rates"], priced["payments"],
+                priced["extra_payments"]
+            )
+        ]
+    return {"summary": summary.rename(columns={"loan_id": "Scenario"}), "traces": traces, "figures": {}}
+
+def payoff_plan_results(balances, annual_rates, minimum_payments, budget, strategy, start_date):
+    # The chosen plan, plus the avalanche and snowball totals to compare it with
+    with telemetry.span("payoff_plan"):
+        order = np.arange(len(balances)) if strategy == "custom" else None
+        plan = plan_payoff(balances, annual_rates, minimum_payments, budget, strategy, order, start_date)
+        totals = {
+            name: plan_payoff(balances, annual_rates, minimum_payments, budget, name)["total_interest"]
+            for name in ("avalanche", "snowball")
+        }
+    return {"plan": plan, "totals": totals, "figures": {}}
+
+def comparison_bars(values, text, title, yaxis_title):
+    # The original loan next to the loan with extra payments
+    return go.Figure(
+        data=[go.Bar(
+            x=['Original Loan', 'With Extra Payments'],
+            y=values,
+            text=text,
+            textposition='auto',
+            marker_color=[COLORS["red"], COLORS["green"]]
+        )],
+        layout=dict(template=chart_template(), title_text=title, yaxis_title_text=yaxis_title)
     )
 
-    return fig
-
-def plot_monthly_breakdown(monthly_payment, extra_payment=0):
-    # Create data for the monthly payment breakdown
-    payment_data = pd.DataFrame({
-        'Category': ['Regular Payment', 'Extra Payment'],
-        'Amount': [monthly_payment, extra_payment]
-    })
-
-    # Filter out zero values
-    payment_data = payment_data[payment_data['Amount'] > 0]
-
-    fig = px.bar(
-        payment_data,
-        x='Category',
-        y='Amount',
-        color='Category',
-        color_discrete_map={
-            'Regular Payment': '#3b82f6',
-            'Extra Payment': '#10b981'
-        },
-        text='Amount'  # Use the 'Amount' column for dynamic text
-    )
+# Rows per page of the detailed schedule: ten years of monthly payments
+SCHEDULE_PAGE_SIZE = 120
+
+# Money columns are formatted by the browser instead of a pandas Styler
+SCHEDULE_COLUMN_CONFIG = {
+    "Payment #": st.column_config.NumberColumn("Payment #", format="%d"),
+    "Date": st.column_config.DateColumn("Date", format="MMM D, YYYY"),
+    "Total Payment": st.column_config.NumberColumn("Total Payment", format="dollar"),
+    "Interest": st.column_config.NumberColumn("Interest", format="dollar"),
+    "Principal": st.column_config.NumberColumn("Principal", format="dollar"),
+    "Remaining Balance": st.column_config.NumberColumn("Remaining Balance", format="dollar"),
+}
 
-    fig.update_layout(
-        title=dict(
-            text="Monthly Payment Breakdown",
-            font=dict(family="Poppins, sans-serif", size=20, color="#1e3a8a"),
-            x=0.5,
-            xanchor='center'
-        ),
-        xaxis=dict(
-            title="",
-            showgrid=False
-        ),
-        yaxis=dict(
-            title=dict(
-                text="Amount ($)",
-                font=dict(family="Poppins, sans-serif", size=14, color="#64748b")
-            ),
-            tickfont=dict(family="Poppins, sans-serif", size=12, color="#64748b")
-        ),
-        showlegend=False,
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)"
+@st.fragment
+def schedule_view(principal, annual_rate, monthly_payment, extra_payment, start_date, key, rate_schedule=None,
+                  events=None):
+    # Detailed schedule tab. Runs as a fragment so paging does not rerun the
+    # whole app, and the schedule is only fetched and sent to the browser once
+    # the user asks for it, one page at a time.
+    st.download_button(
+        "Download full schedule (CSV)",
+        data=csv_download(lambda: iter_schedule_chunks(
+            principal, annual_rate, monthly_payment, extra_payment, start_date, rate_schedule=rate_schedule,
+            events=events
+        )),
+        file_name="amortization_schedule.csv",
+        mime="text/csv",
+        on_click="ignore",
+        key=f"{key}_download"
     )
 
-    fig.update_traces(
-        texttemplate='$%{text:.2f}',
-        textposition='outside',
-        textfont=dict(size=14, color='black')  # Ensure text is readable
-    )
+    if not st.toggle("Show payment schedule", key=f"{key}_show"):
+        st.caption("Turn on to load the month-by-month payment schedule.")
+        return
+
+    with telemetry.span("schedule_table"):
+        schedule, months, _ = cached_amortization_schedule(
+            principal, annual_rate, monthly_payment, extra_payment, start_date, rate_schedule, events
+        )
+    pages = max(1, -(-months // SCHEDULE_PAGE_SIZE))
+    page = 0
+    if pages > 1:
+        page = st.selectbox(
+            "Payments",
+            range(pages),
+            format_func=lambda p: f"{p * SCHEDULE_PAGE_SIZE + 1}–{min((p + 1) * SCHEDULE_PAGE_SIZE, months)}",
+            key=f"{key}_page"
+        )
+
+    with telemetry.span("render.schedule_table"):
+        st.dataframe(
+            schedule.iloc[page * SCHEDULE_PAGE_SIZE:(page + 1) * SCHEDULE_PAGE_SIZE],
+            column_config=SCHEDULE_COLUMN_CONFIG,
+            hide_index=True,
+            use_container_width=True,
+            height=400
+        )
+
+# Scenario table of the comparison mode, and its priced summary
+SCENARIO_COLUMN_CONFIG = {
+    "Scenario": st.column_config.TextColumn("Scenario", required=True),
+    "Loan Amount": st.column_config.NumberColumn("Loan Amount", min_value=0.0, step=1000.0, format="dollar"),
+    "Rate (%)": st.column_config.NumberColumn("Rate (%)", min_value=0.0, step=0.125, format="%.3f"),
+    "Term (Years)": st.column_config.NumberColumn("Term (Years)", min_value=1, max_value=40, step=1, format="%d"),
+    "Extra Payment": st.column_config.NumberColumn("Extra Payment", min_value=0.0, step=50.0, format="dollar"),
+}
 
-    return fig
-
-
-def plot_comparison(data, title="Payment Comparison"):
-    fig = px.bar(
-        data,
-        x='Category',
-        y='Amount',
-        color='Category',
-        color_discrete_map={
-            'Old Payment': '#ef4444',
-            'New Payment': '#3b82f6',
-            'Old Interest': '#f97316',
-            'New Interest': '#10b981'
-        },
-        text='Amount'  # Use the 'Amount' column for dynamic text
-    )
+SCENARIO_SUMMARY_CONFIG = {
+    "Monthly Payment": st.column_config.NumberColumn("Monthly Payment", format="dollar"),
+    "Extra Payment": st.column_config.NumberColumn("Extra Payment", format="dollar"),
+    "Months": st.column_config.NumberColumn("Months", format="%d"),
+    "Total Interest": st.column_config.NumberColumn("Total Interest", format="dollar"),
+    "Total Paid": st.column_config.NumberColumn("Total Paid", format="dollar"),
+    "Payoff Date": st.column_config.DateColumn("Payoff Date", format="MMM YYYY"),
+}
 
-    fig.update_layout(
-        title=dict(
-            text=title,
-            font=dict(family="Poppins, sans-serif", size=20, color="#1e3a8a"),
-            x=0.5,
-            xanchor='center'
-        ),
-        xaxis=dict(
-            title="",
-            showgrid=False
-        ),
-        yaxis=dict(
-            title="Amount ($)",
-            titlefont=dict(family="Poppins, sans-serif", size=14, color="#64748b"),
-            tickfont=dict(family="Poppins, sans-serif", size=12, color="#64748b")
-        ),
-        showlegend=False,
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)"
-    )
+# Debt table of the payoff planner
+DEBT_COLUMN_CONFIG = {
+    "Debt": st.column_config.TextColumn("Debt", required=True),
+    "Balance": st.column_config.NumberColumn("Balance", min_value=0.0, step=100.0, format="dollar"),
+    "Rate (%)": st.column_config.NumberColumn("Rate (%)", min_value=0.0, step=0.25, format="%.2f"),
+    "Minimum Payment": st.column_config.NumberColumn("Minimum Payment", min_value=0.0, step=10.0, format="dollar"),
+}
 
-    fig.update_traces(
-        texttemplate='$%{text}',
-        textposition='outside',
-        textfont=dict(size=14, color='black')  # Ensure text is readable
-    )
+PAYOFF_STRATEGY_HELP = (
+    "Avalanche pays the highest rate first, snowball the smallest balance first, custom follows the table "
+    "from top to bottom, and optimized searches for the order with the least total interest. Whatever is left "
+    "of the budget after the minimums goes to the first unpaid debt, and paid-off minimums roll over."
+)
 
-    return fig
+def timing_panel():
+    # Debug breakdown of this rerun, shown only while timing is enabled
+    # (LOANCORE_TIMING=1); the spans themselves cost nothing otherwise
+    breakdown = telemetry.finish_rerun()
+    if breakdown is None:
+        return
+
+    with st.sidebar.expander("⏱️ Rerun Timing"):
+        st.dataframe(
+            pd.DataFrame({
+                "Stage": ["\u00a0\u00a0" * s["depth"] + s["span"] for s in breakdown],
+                "ms": [s["ms"] for s in breakdown],
+            }),
+            column_config={"ms": st.column_config.NumberColumn("ms", format="%.2f")},
+            hide_index=True,
+            use_container_width=True
+        )
+        for name, cache in get_caches().items():
+            stats = cache.stats()
+            st.caption(f"{name} cache: {stats['hits']} hits, {stats['misses']} misses, "
+                       f"{stats['size']}/{stats['maxsize']} entries")
+        st.code(telemetry.prometheus_text(), language="text")
 
 def main():
+    telemetry.start_rerun()
+
     # App header with animation effect
     st.markdown("""
         <div style="text-align: center; animation: fadeIn 1.5s;">
@@ -481,9 +552,6 @@ def main():
     # Create tabs for organization
     tabs = st.tabs(["📊 Calculator"])
 
-    # Define start_date at the beginning of the main function
-    start_date = date.today().replace(day=1)
-
     with tabs[0]:
         with st.sidebar:
             st.markdown("""
@@ -507,7 +575,9 @@ def main():
                 [
                     f"{icons['payment']} Calculate Monthly Payment",
                     f"{icons['term']} Calculate Loan Term",
-                    f"{icons['interest']} Calculate Interest Saved"
+                    f"{icons['interest']} Calculate Interest Saved",
+                    f"{icons['compare']} Compare Loan Offers",
+                    f"{icons['debt']} Plan Debt Payoff"
                 ],
                 help="Choose the type of calculation you want to perform."
             )
@@ -535,6 +605,37 @@ def main():
                     format="%.2f"
                 )
 
+                # Payments fall on this day of each following month, or on the
+                # last day of shorter months
+                start_date = st.date_input(
+                    "Loan Start Date",
+                    value=date.today().replace(day=1),
+                    help="The first payment is due one month after this date."
+                )
+
+            # Adjustable-rate option for payment plans
+            rate_schedule = None
+            if option == "Calculate Monthly Payment":
+                with st.expander("Rate Type"):
+                    rate_type = st.radio("Rate Type", ["Fixed", "Adjustable (ARM)"], horizontal=True, label_visibility="collapsed")
+                    if rate_type == "Adjustable (ARM)":
+                        fixed_years = st.selectbox("Fixed Period (Years)", [1, 3, 5, 7, 10], index=2)
+                        index_rate = st.number_input(
+                            "Expected Rate After Reset (%)",
+                            min_value=0.0,
+                            value=annual_rate + 2.0,
+                            step=0.25,
+                            format="%.2f"
+                        )
+                        periodic_cap = st.number_input("Periodic Cap (%)", min_value=0.0, value=2.0, step=0.5, format="%.2f")
+                        lifetime_cap = st.number_input("Lifetime Cap (%)", min_value=0.0, value=5.0, step=0.5, format="%.2f")
+                        rate_schedule = arm_rate_schedule(
+                            index_rate,
+                            fixed_months=fixed_years * 12,
+                            periodic_cap=periodic_cap,
+                            lifetime_cap=lifetime_cap
+                        )
+
             # Add information about the app in the sidebar
             with st.expander("About This Calculator"):
                 st.markdown("""
@@ -570,126 +671,127 @@ def main():
                     )
 
                     num_payments = years * 12
-                    monthly_rate = annual_rate / 100 / 12
-
-                    monthly_payment = (principal * monthly_rate) / (1 - (1 + monthly_rate) ** -num_payments) if monthly_rate > 0 else principal / num_payments
+                    monthly_payment = solve_payment(principal, annual_rate, num_payments)
 
                     calc_button = st.button("Calculate Payment Plan", type="primary", use_container_width=True)
-                    if calc_button:
-                        with st.spinner("Analyzing your loan..."):
-                            # Add a slight delay for effect
-                            import time
-                            time.sleep(0.5)
-
-                            # Calculate schedules
-                            schedule, months, total_interest = calculate_amortization_schedule(
-                                principal, annual_rate, monthly_payment, extra_payment, start_date
-                            )
-                            years_reduced = months // 12
-                            normal_schedule, normal_months, normal_interest = calculate_amortization_schedule(
-                                principal, annual_rate, monthly_payment, 0, start_date
+                    with st.spinner("Analyzing your loan..."):
+                        result = calculation(
+                            ("payment_plan", loan_type_key) + schedule_cache_key(
+                                principal, annual_rate, monthly_payment, extra_payment, start_date, rate_schedule
+                            ),
+                            calc_button,
+                            lambda: payment_plan_results(
+                                principal, annual_rate, monthly_payment, extra_payment, start_date, rate_schedule
                             )
-                            interest_saved = normal_interest - total_interest
-                            time_saved = normal_months - months
-
-                            # Display metrics in cards
-                            st.markdown("### 📈 Your Loan Overview")
-                            col_metrics = st.columns(4)
-                            with col_metrics[0]:
+                        )
+                    if result:
+                        months, total_interest = result["months"], result["total_interest"]
+                        normal_months, normal_interest = result["normal_months"], result["normal_interest"]
+                        years_reduced = months // 12
+                        interest_saved = normal_interest - total_interest
+                        time_saved = normal_months - months
+
+                        # Display metrics in cards
+                        st.markdown("### 📈 Your Loan Overview")
+                        col_metrics = st.columns(4)
+                        with col_metrics[0]:
+                            st.markdown(f"""
+                                <div class="metric-card">
+                                    <div class="metric-label">Monthly Payment</div>
+                                    <div class="metric-value">${monthly_payment:.2f}</div>
+                                </div>
+                            """, unsafe_allow_html=True)
+                        with col_metrics[1]:
+                            st.markdown(f"""
+                                <div class="metric-card">
+                                    <div class="metric-label">Payoff Time</div>
+                                    <div class="metric-value">{years_reduced} yrs {months % 12} mths</div>
+                                </div>
+                            """, unsafe_allow_html=True)
+                        with col_metrics[2]:
+                            st.markdown(f"""
+                                <div class="metric-card">
+                                    <div class="metric-label">Total Interest</div>
+                                    <div class="metric-value">${total_interest:,.2f}</div>
+                                </div>
+                            """, unsafe_allow_html=True)
+                        with col_metrics[3]:
+                            st.markdown(f"""
+                                <div class="metric-card" style="border-left: 5px solid #10b981;">
+                                    <div class="metric-label">Interest Saved</div>
+                                    <div class="metric-value" style="color: #10b981;">${interest_saved:,.2f}</div>
+                                </div>
+                            """, unsafe_allow_html=True)
+
+                        # Display additional metrics if extra payments are made
+                        if extra_payment > 0:
+                            st.markdown("### 🚀 Time & Money Saved With Extra Payments")
+                            time_metric, money_metric = st.columns(2)
+                            with time_metric:
+                                months_saved = normal_months - months
+                                years_saved = months_saved // 12
+                                months_remainder = months_saved % 12
                                 st.markdown(f"""
-                                    <div class="metric-card">
-                                        <div class="metric-label">Monthly Payment</div>
-                                        <div class="metric-value">${monthly_payment:.2f}</div>
-                                    </div>
-                                """, unsafe_allow_html=True)
-                            with col_metrics[1]:
-                                st.markdown(f"""
-                                    <div class="metric-card">
-                                        <div class="metric-label">Payoff Time</div>
-                                        <div class="metric-value">{years_reduced} yrs {months % 12} mths</div>
-                                    </div>
-                                """, unsafe_allow_html=True)
-                            with col_metrics[2]:
-                                st.markdown(f"""
-                                    <div class="metric-card">
-                                        <div class="metric-label">Total Interest</div>
-                                        <div class="metric-value">${total_interest:,.2f}</div>
+                                    <div class="metric-card" style="border-left: 5px solid #8b5cf6;">
+                                        <div class="metric-label">Time Saved</div>
+                                        <div class="metric-value" style="color: #8b5cf6;">
+                                            {years_saved} yrs {months_remainder} mths
+                                        </div>
                                     </div>
                                 """, unsafe_allow_html=True)
-                            with col_metrics[3]:
+                            with money_metric:
                                 st.markdown(f"""
-                                    <div class="metric-card" style="border-left: 5px solid #10b981;">
-                                        <div class="metric-label">Interest Saved</div>
-                                        <div class="metric-value" style="color: #10b981;">${interest_saved:,.2f}</div>
+                                    <div class="metric-card" style="border-left: 5px solid #f97316;">
+                                        <div class="metric-label">Money Saved</div>
+                                        <div class="metric-value" style="color: #f97316;">
+                                            ${normal_interest - total_interest:,.2f}
+                                        </div>
                                     </div>
                                 """, unsafe_allow_html=True)
 
-                            # Display additional metrics if extra payments are made
-                            if extra_payment > 0:
-                                st.markdown("### 🚀 Time & Money Saved With Extra Payments")
-                                time_metric, money_metric = st.columns(2)
-                                with time_metric:
-                                    months_saved = normal_months - months
-                                    years_saved = months_saved // 12
-                                    months_remainder = months_saved % 12
-                                    st.markdown(f"""
-                                        <div class="metric-card" style="border-left: 5px solid #8b5cf6;">
-                                            <div class="metric-label">Time Saved</div>
-                                            <div class="metric-value" style="color: #8b5cf6;">
-                                                {years_saved} yrs {months_remainder} mths
-                                            </div>
-                                        </div>
-                                    """, unsafe_allow_html=True)
-                                with money_metric:
-                                    st.markdown(f"""
-                                        <div class="metric-card" style="border-left: 5px solid #f97316;">
-                                            <div class="metric-label">Money Saved</div>
-                                            <div class="metric-value" style="color: #f97316;">
-                                                ${normal_interest - total_interest:,.2f}
-                                            </div>
-                                        </div>
-                                    """, unsafe_allow_html=True)
-
-                            # Create tabs for different visualizations
-                            viz_tab1, viz_tab2, viz_tab3 = st.tabs([
-                                "Amortization Chart",
-                                "Payment Breakdown",
-                                "Detailed Schedule"
-                            ])
-
-                            with viz_tab1:
+                        # Create tabs for different visualizations
+                        viz_tab1, viz_tab2, viz_tab3 = st.tabs([
+                            "Amortization Chart",
+                            "Payment Breakdown",
+                            "Detailed Schedule"
+                        ])
+
+                        with viz_tab1:
+                            with telemetry.span("figure.amortization"):
+                                amortization_fig = result_figure(result, "amortization", lambda: cached_plot_amortization(
+                                    principal, annual_rate, monthly_payment, extra_payment, start_date, loan_type_key,
+                                    rate_schedule
+                                ))
+                            with telemetry.span("render.amortization"):
+                                st.plotly_chart(amortization_fig, use_container_width=True, theme=None)
+                            rate_scenarios_view(principal, annual_rate, monthly_payment, extra_payment, num_payments, loan_type_key)
+
+                        with viz_tab2:
+                            col_pie, col_bar = st.columns(2)
+                            with col_pie, telemetry.span("chart.payment_breakdown"):
                                 st.plotly_chart(
-                                    plot_amortization(schedule, loan_type_key),
-                                    use_container_width=True
+                                    result_figure(result, "payment_breakdown",
+                                                  lambda: cached_figure(plot_payment_breakdown, principal, total_interest)),
+                                    use_container_width=True,
+                                    theme=None
                                 )
-
-                            with viz_tab2:
-                                col_pie, col_bar = st.columns(2)
-                                with col_pie:
-                                    st.plotly_chart(
-                                        plot_payment_breakdown(principal, total_interest),
-                                        use_container_width=True
-                                    )
-                                with col_bar:
-                                    if extra_payment > 0:
+                            with col_bar:
+                                if extra_payment > 0:
+                                    with telemetry.span("chart.monthly_breakdown"):
                                         st.plotly_chart(
-                                            plot_monthly_breakdown(monthly_payment, extra_payment),
-                                            use_container_width=True
+                                            result_figure(result, "monthly_breakdown",
+                                                          lambda: cached_figure(plot_monthly_breakdown, monthly_payment, extra_payment)),
+                                            use_container_width=True,
+                                            theme=None
                                         )
-                                    else:
-                                        st.info("Add extra monthly payments to see payment breakdown.")
-
-                            with viz_tab3:
-                                st.dataframe(
-                                    schedule.style.format({
-                                        "Total Payment": "${:,.2f}",
-                                        "Interest": "${:,.2f}",
-                                        "Principal": "${:,.2f}",
-                                        "Remaining Balance": "${:,.2f}"
-                                    }),
-                                    use_container_width=True,
-                                    height=400
-                                )
+                                else:
+                                    st.info("Add extra monthly payments to see payment breakdown.")
+
+                        with viz_tab3:
+                            schedule_view(
+                                principal, annual_rate, monthly_payment, extra_payment, start_date, key="payment_plan",
+                                rate_schedule=rate_schedule
+                            )
 
                 elif option == "Calculate Interest Saved":
                     # Get baseline information
@@ -701,10 +803,9 @@ def main():
                     )
 
                     num_payments = years * 12
-                    monthly_rate = annual_rate / 100 / 12
 
                     # Calculate original monthly payment
-                    monthly_payment = (principal * monthly_rate) / (1 - (1 + monthly_rate) ** -num_payments) if monthly_rate > 0 else principal / num_payments
+                    monthly_payment = solve_payment(principal, annual_rate, num_payments)
 
                     # Get extra payment information
                     extra_payment = st.number_input(
@@ -715,121 +816,116 @@ def main():
                         format="%.2f"
                     )
 
-                    calc_button = st.button("Calculate Interest Saved", type="primary", use_container_width=True)
-                    if calc_button:
-                        with st.spinner("Calculating potential savings..."):
-                            # Add a slight delay for effect
-                            import time
-                            time.sleep(0.5)
-
-                            # Calculate original payment schedule
-                            original_schedule, original_months, original_interest = calculate_amortization_schedule(
-                                principal, annual_rate, monthly_payment, 0, start_date
-                            )
-
-                            # Calculate accelerated payment schedule
-                            new_schedule, new_months, new_interest = calculate_amortization_schedule(
-                                principal, annual_rate, monthly_payment, extra_payment, start_date
-                            )
-
-                            # Calculate savings
-                            interest_saved = original_interest - new_interest
-                            time_saved = original_months - new_months
-                            years_saved = time_saved // 12
-                            months_saved = time_saved % 12
-
-                            # Display metrics in cards
-                            st.markdown("### 💰 Interest Savings Analysis")
-
-                            col_metrics = st.columns(3)
-                            with col_metrics[0]:
-                                st.markdown(f"""
-                                    <div class="metric-card" style="border-left: 5px solid #10b981;">
-                                        <div class="metric-label">Interest Saved</div>
-                                        <div class="metric-value" style="color: #10b981;">${interest_saved:,.2f}</div>
-                                    </div>
-                                """, unsafe_allow_html=True)
-                            with col_metrics[1]:
-                                st.markdown(f"""
-                                    <div class="metric-card" style="border-left: 5px solid #8b5cf6;">
-                                        <div class="metric-label">Time Saved</div>
-                                        <div class="metric-value" style="color: #8b5cf6;">{years_saved} yrs {months_saved} mths</div>
-                                    </div>
-                                """, unsafe_allow_html=True)
-                            with col_metrics[2]:
-                                st.markdown(f"""
-                                    <div class="metric-card">
-                                        <div class="metric-label">Original Payoff</div>
-                                        <div class="metric-value">{original_months // 12} yrs {original_months % 12} mths</div>
-                                    </div>
-                                """, unsafe_allow_html=True)
-
-                            # Create comparison data for visualization
-                            comparison_data = pd.DataFrame({
-                                'Category': ['Original Interest', 'Interest with Extra Payments', 'Time Reduction'],
-                                'Amount': [original_interest, new_interest, time_saved / original_months * 100],
-                                'Label': [f"${original_interest:,.2f}", f"${new_interest:,.2f}", f"{years_saved} yrs {months_saved} mths"]
-                            })
-
-                            # Create tabs for different visualizations
-                            viz_tab1, viz_tab2 = st.tabs(["Comparison Chart", "Detailed Schedule"])
-
-                            with viz_tab1:
-                                col1, col2 = st.columns(2)
-                                with col1:
-                                    # Plot interest comparison
-                                    comparison_fig = go.Figure()
-
-                                    comparison_fig.add_trace(go.Bar(
-                                        x=['Original Loan', 'With Extra Payments'],
-                                        y=[original_interest, new_interest],
-                                        text=[f"${original_interest:,.2f}", f"${new_interest:,.2f}"],
-                                        textposition='auto',
-                                        marker_color=['#ef4444', '#10b981']
-                                    ))
-
-                                    comparison_fig.update_layout(
-                                        title="Interest Comparison",
-                                        yaxis_title="Total Interest ($)",
-                                        plot_bgcolor="rgba(0,0,0,0)",
-                                        paper_bgcolor="rgba(0,0,0,0)",
-                                    )
-
-                                    st.plotly_chart(comparison_fig, use_container_width=True)
-
-                                with col2:
-                                    # Plot time comparison
-                                    time_fig = go.Figure()
-
-                                    time_fig.add_trace(go.Bar(
-                                        x=['Original Loan', 'With Extra Payments'],
-                                        y=[original_months, new_months],
-                                        text=[f"{original_months // 12}y {original_months % 12}m",
-                                            f"{new_months // 12}y {new_months % 12}m"],
-                                        textposition='auto',
-                                        marker_color=['#ef4444', '#10b981']
-                                    ))
-
-                                    time_fig.update_layout(
-                                        title="Loan Term Comparison",
-                                        yaxis_title="Months to Payoff",
-                                        plot_bgcolor="rgba(0,0,0,0)",
-                                        paper_bgcolor="rgba(0,0,0,0)",
-                                    )
-
-                                    st.plotly_chart(time_fig, use_container_width=True)
+                    # One-off and recurring prepayments on top of the extra monthly payment
+                    with st.expander("Additional Prepayments"):
+                        col_lump, col_lump_at = st.columns(2)
+                        with col_lump:
+                            lump_sum = st.number_input("Lump Sum ($)", min_value=0.0, value=0.0, step=1000.0, format="%.2f")
+                        with col_lump_at:
+                            lump_sum_payment = st.number_input("Paid With Payment #", min_value=1, max_value=num_payments,
+                                                               value=min(12, num_payments), step=1)
+                        annual_extra = st.number_input("Extra Payment Once a Year ($)", min_value=0.0, value=0.0,
+                                                       step=500.0, format="%.2f")
+                        biweekly = st.checkbox("Biweekly payments (13 monthly payments a year)")
+                    events = PrepaymentEvents(
+                        lump_sums={lump_sum_payment: lump_sum}, annual_extra=annual_extra, biweekly=biweekly
+                    )
 
-                            with viz_tab2:
-                                st.dataframe(
-                                    new_schedule.style.format({
-                                        "Total Payment": "${:,.2f}",
-                                        "Interest": "${:,.2f}",
-                                        "Principal": "${:,.2f}",
-                                        "Remaining Balance": "${:,.2f}"
-                                    }),
-                                    use_container_width=True,
-                                    height=400
-                                )
+                    calc_button = st.button("Calculate Interest Saved", type="primary", use_container_width=True)
+                    with st.spinner("Calculating potential savings..."):
+                        savings = calculation(
+                            ("interest_saved",) + schedule_cache_key(
+                                principal, annual_rate, monthly_payment, extra_payment, start_date, events=events
+                            ),
+                            calc_button,
+                            lambda: interest_saved_results(principal, annual_rate, monthly_payment, extra_payment, events)
+                        )
+                    if savings:
+                        original_months, original_interest = savings["original_months"], savings["original_interest"]
+                        new_months, new_interest = savings["new_months"], savings["new_interest"]
+
+                        # Calculate savings
+                        interest_saved = savings["interest_saved"]
+                        time_saved = savings["months_saved"]
+                        years_saved = time_saved // 12
+                        months_saved = time_saved % 12
+
+                        # Display metrics in cards
+                        st.markdown("### 💰 Interest Savings Analysis")
+
+                        col_metrics = st.columns(3)
+                        with col_metrics[0]:
+                            st.markdown(f"""
+                                <div class="metric-card" style="border-left: 5px solid #10b981;">
+                                    <div class="metric-label">Interest Saved</div>
+                                    <div class="metric-value" style="color: #10b981;">${interest_saved:,.2f}</div>
+                                </div>
+                            """, unsafe_allow_html=True)
+                        with col_metrics[1]:
+                            st.markdown(f"""
+                                <div class="metric-card" style="border-left: 5px solid #8b5cf6;">
+                                    <div class="metric-label">Time Saved</div>
+                                    <div class="metric-value" style="color: #8b5cf6;">{years_saved} yrs {months_saved} mths</div>
+                                </div>
+                            """, unsafe_allow_html=True)
+                        with col_metrics[2]:
+                            st.markdown(f"""
+                                <div class="metric-card">
+                                    <div class="metric-label">Original Payoff</div>
+                                    <div class="metric-value">{original_months // 12} yrs {original_months % 12} mths</div>
+                                </div>
+                            """, unsafe_allow_html=True)
+
+                        # Create comparison data for visualization
+                        comparison_data = pd.DataFrame({
+                            'Category': ['Original Interest', 'Interest with Extra Payments', 'Time Reduction'],
+                            'Amount': [original_interest, new_interest, time_saved / original_months * 100],
+                            'Label': [f"${original_interest:,.2f}", f"${new_interest:,.2f}", f"{years_saved} yrs {months_saved} mths"]
+                        })
+
+                        # Create tabs for different visualizations
+                        viz_tab1, viz_tab_sweep, viz_tab2 = st.tabs(["Comparison Chart", "Extra Payment Sweep", "Detailed Schedule"])
+
+                        with viz_tab1:
+                            col1, col2 = st.columns(2)
+                            with col1:
+                                # Plot interest comparison
+                                comparison_fig = result_figure(savings, "interest_comparison", lambda: comparison_bars(
+                                    [original_interest, new_interest],
+                                    [f"${original_interest:,.2f}", f"${new_interest:,.2f}"],
+                                    "Interest Comparison",
+                                    "Total Interest ($)"
+                                ))
+
+                                with telemetry.span("render.interest_comparison"):
+                                    st.plotly_chart(comparison_fig, use_container_width=True, theme=None)
+
+                            with col2:
+                                # Plot time comparison
+                                time_fig = result_figure(savings, "term_comparison", lambda: comparison_bars(
+                                    [original_months, new_months],
+                                    [f"{original_months // 12}y {original_months % 12}m",
+                                     f"{new_months // 12}y {new_months % 12}m"],
+                                    "Loan Term Comparison",
+                                    "Months to Payoff"
+                                ))
+
+                                with telemetry.span("render.term_comparison"):
+                                    st.plotly_chart(time_fig, use_container_width=True, theme=None)
+
+                        with viz_tab_sweep:
+                            with telemetry.span("figure.savings_sweep"):
+                                sweep_fig, heatmap_fig = result_figure(savings, "savings_sweep", lambda: cached_figure(
+                                    savings_sweep_figures, principal, annual_rate, monthly_payment, num_payments,
+                                    max(2000.0, 2 * extra_payment)
+                                ))
+                            with telemetry.span("render.savings_sweep"):
+                                st.plotly_chart(sweep_fig, use_container_width=True, theme=None)
+                                st.plotly_chart(heatmap_fig, use_container_width=True, theme=None)
+
+                        with viz_tab2:
+                            schedule_view(principal, annual_rate, monthly_payment, extra_payment, start_date, key="interest_saved",
+                                          events=events)
                 elif option == "Calculate Loan Term":
                     # Calculate the minimum payment required (interest-only payment)
                     min_payment = principal * (annual_rate / 100 / 12) if annual_rate > 0 else 1.0
@@ -860,71 +956,282 @@ def main():
                     st.markdown("### Click below to calculate your loan term")
                     calc_button = st.button("Calculate Loan Term", type="primary", use_container_width=True)
 
-                    if calc_button:
-                        try:
-                            with st.spinner("Calculating your loan term..."):
-                                import time
-                                time.sleep(0.5)  # Simulate processing delay
+                    try:
+                        # Validate monthly payment
+                        if calc_button and monthly_payment <= min_payment:
+                            st.error(f"Monthly payment must be greater than the minimum interest-only payment of ${min_payment:.2f}.")
+                        else:
+                            result = calculation(
+                                ("loan_term", loan_type_key) + schedule_cache_key(
+                                    principal, annual_rate, monthly_payment, extra_payment, start_date
+                                ),
+                                calc_button,
+                                lambda: loan_term_results(principal, annual_rate, monthly_payment, extra_payment)
+                            )
+                            if result:
+                                months, total_interest = result["months"], result["total_interest"]
+                                years = months // 12
 
-                                # Validate monthly payment
-                                if monthly_payment <= min_payment:
-                                    st.error(f"Monthly payment must be greater than the minimum interest-only payment of ${min_payment:.2f}.")
-                                else:
-                                    # Calculate the amortization schedule
-                                    schedule, months, total_interest = calculate_amortization_schedule(
-                                        principal, annual_rate, monthly_payment, extra_payment, start_date
+                                # Display results
+                                st.markdown("### 📊 Term Analysis Results")
+
+                                col_metrics = st.columns(3)
+                                with col_metrics[0]:
+                                    st.markdown(f"""
+                                        <div class="metric-card">
+                                            <div class="metric-label">Payoff Time</div>
+                                            <div class="metric-value">{years} yrs {months % 12} mths</div>
+                                        </div>
+                                    """, unsafe_allow_html=True)
+                                with col_metrics[1]:
+                                    st.markdown(f"""
+                                        <div class="metric-card">
+                                            <div class="metric-label">Total Interest</div>
+                                            <div class="metric-value">${total_interest:,.2f}</div>
+                                        </div>
+                                    """, unsafe_allow_html=True)
+                                with col_metrics[2]:
+                                    st.markdown(f"""
+                                        <div class="metric-card">
+                                            <div class="metric-label">Total Payments</div>
+                                            <div class="metric-value">${principal + total_interest:,.2f}</div>
+                                        </div>
+                                    """, unsafe_allow_html=True)
+
+                                # Create tabs for different visualizations
+                                viz_tab1, viz_tab2 = st.tabs(["Amortization Chart", "Detailed Schedule"])
+
+                                with viz_tab1:
+                                    with st.spinner("Building amortization schedule..."), telemetry.span("figure.amortization"):
+                                        amortization_fig = result_figure(result, "amortization", lambda: cached_plot_amortization(
+                                            principal, annual_rate, monthly_payment, extra_payment, start_date, loan_type_key
+                                        ))
+                                    with telemetry.span("render.amortization"):
+                                        st.plotly_chart(amortization_fig, use_container_width=True, theme=None)
+
+                                with viz_tab2:
+                                    schedule_view(principal, annual_rate, monthly_payment, extra_payment, start_date, key="loan_term")
+                    except Exception as e:
+                        st.error(f"An error occurred during calculation. Please check your inputs and try again.")
+
+                elif option == "Compare Loan Offers":
+                    st.markdown("### 📋 Loan Scenarios")
+                    st.caption("One row per lender offer or payoff plan. Rows start from the loan in the sidebar.")
+
+                    default_years = 30 if loan_type_key == "mortgage" else 5 if loan_type_key == "auto" else 3
+                    scenarios = st.data_editor(
+                        pd.DataFrame({
+                            "Scenario": ["Offer A", "Offer B", "Offer A + Extra"],
+                            "Loan Amount": [principal] * 3,
+                            "Rate (%)": [annual_rate, max(annual_rate - 0.5, 0.0), annual_rate],
+                            "Term (Years)": [default_years, max(default_years // 2, 1), default_years],
+                            "Extra Payment": [0.0, 0.0, 200.0],
+                        }),
+                        column_config=SCENARIO_COLUMN_CONFIG,
+                        num_rows="dynamic",
+                        hide_index=True,
+                        use_container_width=True,
+                        key="scenarios"
+                    )
+
+                    # Scenarios as a loan tape for the batch engine
+                    names = scenarios["Scenario"].fillna("").astype(str).str.strip()
+                    tape = pd.DataFrame({
+                        "loan_id": [name or f"Scenario {i + 1}" for i, name in enumerate(names)],
+                        "principal": pd.to_numeric(scenarios["Loan Amount"], errors="coerce"),
+                        "annual_rate": pd.to_numeric(scenarios["Rate (%)"], errors="coerce"),
+                        "term_months": pd.to_numeric(scenarios["Term (Years)"], errors="coerce") * 12,
+                        "extra_payment": pd.to_numeric(scenarios["Extra Payment"], errors="coerce"),
+                    })
+
+                    calc_button = st.button("Compare Scenarios", type="primary", use_container_width=True)
+                    with st.spinner("Pricing scenarios..."):
+                        result = calculation(
+                            ("compare", start_date.isoformat(), tape.to_json(orient="values")),
+                            calc_button,
+                            lambda: scenario_comparison_results(tape, start_date)
+                        )
+                    if result:
+                        summary = result["summary"]
+                        priced = summary[summary["Status"] == "ok"]
+                        unpriced = summary[summary["Status"] != "ok"]
+                        if len(unpriced):
+                            st.warning("Not priced: " + ", ".join(
+                                f"{name} ({status})" for name, status in zip(unpriced["Scenario"], unpriced["Status"])
+                            ))
+
+                        if len(priced):
+                            cheapest = priced.loc[priced["Total Interest"].idxmin()]
+                            lowest_payment = priced.loc[priced["Monthly Payment"].add(priced["Extra Payment"]).idxmin()]
+                            fastest = priced.loc[priced["Months"].idxmin()]
+
+                            st.markdown("### ⚖️ Scenario Comparison")
+                            col_metrics = st.columns(3)
+                            for column, label, row, value in (
+                                (col_metrics[0], "Lowest Total Interest", cheapest, f"${cheapest['Total Interest']:,.2f}"),
+                                (col_metrics[1], "Lowest Monthly Outlay", lowest_payment,
+                                 f"${lowest_payment['Monthly Payment'] + lowest_payment['Extra Payment']:,.2f}"),
+                                (col_metrics[2], "Fastest Payoff", fastest,
+                                 f"{fastest['Months'] // 12} yrs {fastest['Months'] % 12} mths"),
+                            ):
+                                with column:
+                                    st.markdown(f"""
+                                        <div class="metric-card">
+                                            <div class="metric-label">{label}: {row['Scenario']}</div>
+                                            <div class="metric-value">{value}</div>
+                                        </div>
+                                    """, unsafe_allow_html=True)
+
+                        st.dataframe(summary, column_config=SCENARIO_SUMMARY_CONFIG, hide_index=True, use_container_width=True)
+
+                        if len(priced):
+                            viz_tab1, viz_tab2 = st.tabs(["Balance Curves", "Total Interest"])
+
+                            with viz_tab1:
+                                with telemetry.span("figure.scenario_balances"):
+                                    balances_fig = result_figure(
+                                        result, "balances", lambda: plot_scenario_balances(result["traces"])
                                     )
+                                with telemetry.span("render.scenario_balances"):
+                                    st.plotly_chart(balances_fig, use_container_width=True, theme=None)
 
-                                    years = months // 12
-
-                                    # Display results
-                                    st.markdown("### 📊 Term Analysis Results")
-
-                                    col_metrics = st.columns(3)
-                                    with col_metrics[0]:
-                                        st.markdown(f"""
-                                            <div class="metric-card">
-                                                <div class="metric-label">Payoff Time</div>
-                                                <div class="metric-value">{years} yrs {months % 12} mths</div>
-                                            </div>
-                                        """, unsafe_allow_html=True)
-                                    with col_metrics[1]:
-                                        st.markdown(f"""
-                                            <div class="metric-card">
-                                                <div class="metric-label">Total Interest</div>
-                                                <div class="metric-value">${total_interest:,.2f}</div>
-                                            </div>
-                                        """, unsafe_allow_html=True)
-                                    with col_metrics[2]:
-                                        st.markdown(f"""
-                                            <div class="metric-card">
-                                                <div class="metric-label">Total Payments</div>
-                                                <div class="metric-value">${principal + total_interest:,.2f}</div>
-                                            </div>
-                                        """, unsafe_allow_html=True)
-
-                                    # Create tabs for different visualizations
-                                    viz_tab1, viz_tab2 = st.tabs(["Amortization Chart", "Detailed Schedule"])
-
-                                    with viz_tab1:
-                                        st.plotly_chart(
-                                            plot_amortization(schedule, loan_type_key),
-                                            use_container_width=True
-                                        )
+                            with viz_tab2:
+                                interest_fig = result_figure(result, "interest", lambda: plot_comparison(
+                                    {"Category": list(priced["Scenario"]), "Amount": list(priced["Total Interest"])},
+                                    "Total Interest by Scenario"
+                                ))
+                                with telemetry.span("render.scenario_interest"):
+                                    st.plotly_chart(interest_fig, use_container_width=True, theme=None)
+
+                elif option == "Plan Debt Payoff":
+                    st.markdown("### 🧾 Your Debts")
+                    debts = st.data_editor(
+                        pd.DataFrame({
+                            "Debt": ["Credit Card", "Store Card", "Car Loan", "Student Loan"],
+                            "Balance": [6500.0, 1800.0, 14000.0, 28000.0],
+                            "Rate (%)": [22.9, 26.5, 6.9, 5.5],
+                            "Minimum Payment": [195.0, 55.0, 320.0, 300.0],
+                        }),
+                        column_config=DEBT_COLUMN_CONFIG,
+                        num_rows="dynamic",
+                        hide_index=True,
+                        use_container_width=True,
+                        key="debts"
+                    )
 
-                                    with viz_tab2:
-                                        st.dataframe(
-                                            schedule.style.format({
-                                                "Total Payment": "${:,.2f}",
-                                                "Interest": "${:,.2f}",
-                                                "Principal": "${:,.2f}",
-                                                "Remaining Balance": "${:,.2f}"
-                                            }),
-                                            use_container_width=True,
-                                            height=400
-                                        )
-                        except Exception as e:
-                            st.error(f"An error occurred during calculation. Please check your inputs and try again.")
+                    # Rows missing a number are left out of the plan
+                    names = debts["Debt"].fillna("").astype(str).str.strip()
+                    debts = pd.DataFrame({
+                        "Debt": [name or f"Debt {i + 1}" for i, name in enumerate(names)],
+                        "Balance": pd.to_numeric(debts["Balance"], errors="coerce"),
+                        "Rate (%)": pd.to_numeric(debts["Rate (%)"], errors="coerce"),
+                        "Minimum Payment": pd.to_numeric(debts["Minimum Payment"], errors="coerce"),
+                    }).dropna()
+                    debts = debts[debts["Balance"] > 0]
+                    minimum_total = float(debts["Minimum Payment"].sum())
+
+                    col_budget, col_strategy = st.columns(2)
+                    with col_budget:
+                        budget = st.number_input(
+                            "Monthly Budget for Debts ($)",
+                            min_value=0.0,
+                            value=1200.0,
+                            step=50.0,
+                            format="%.2f",
+                            help=f"The minimum payments add up to ${minimum_total:,.2f}."
+                        )
+                    with col_strategy:
+                        strategy = st.radio(
+                            "Strategy", ["Avalanche", "Snowball", "Custom", "Optimized"], horizontal=True,
+                            help=PAYOFF_STRATEGY_HELP
+                        ).lower()
+
+                    calc_button = st.button("Plan Debt Payoff", type="primary", use_container_width=True)
+                    if calc_button and not len(debts):
+                        st.error("Add at least one debt with a balance, a rate and a minimum payment.")
+                    elif calc_button and budget < minimum_total:
+                        st.error(f"The budget must cover the minimum payments of ${minimum_total:,.2f}.")
+                    else:
+                        try:
+                            with st.spinner("Planning your payoff..."):
+                                result = calculation(
+                                    ("payoff_plan", strategy, round(budget, 2), start_date.isoformat(),
+                                     debts.to_json(orient="values")),
+                                    calc_button,
+                                    lambda: payoff_plan_results(
+                                        debts["Balance"].to_numpy(), debts["Rate (%)"].to_numpy(),
+                                        debts["Minimum Payment"].to_numpy(), budget, strategy, start_date
+                                    )
+                                )
+                        except ValueError as e:
+                            st.error(str(e))
+                            result = None
+
+                        if result:
+                            plan, totals = result["plan"], result["totals"]
+                            months = plan["months"]
+
+                            st.markdown("### 📅 Your Payoff Plan")
+                            col_metrics = st.columns(3)
+                            with col_metrics[0]:
+                                st.markdown(f"""
+                                    <div class="metric-card">
+                                        <div class="metric-label">Debt-Free In</div>
+                                        <div class="metric-value">{months // 12} yrs {months % 12} mths</div>
+                                    </div>
+                                """, unsafe_allow_html=True)
+                            with col_metrics[1]:
+                                st.markdown(f"""
+                                    <div class="metric-card">
+                                        <div class="metric-label">Total Interest</div>
+                                        <div class="metric-value">${plan['total_interest']:,.2f}</div>
+                                    </div>
+                                """, unsafe_allow_html=True)
+                            with col_metrics[2]:
+                                saved = totals["snowball"] - plan["total_interest"]
+                                st.markdown(f"""
+                                    <div class="metric-card" style="border-left: 5px solid #10b981;">
+                                        <div class="metric-label">Saved vs. Snowball</div>
+                                        <div class="metric-value" style="color: #10b981;">${saved:,.2f}</div>
+                                    </div>
+                                """, unsafe_allow_html=True)
+
+                            order = plan["order"]
+                            st.dataframe(
+                                pd.DataFrame({
+                                    "Order": np.arange(1, len(order) + 1),
+                                    "Debt": debts["Debt"].to_numpy()[order],
+                                    "Paid Off": plan["payoff_date"][order],
+                                    "Months": plan["payoff_month"][order],
+                                    "Interest": plan["interest"][order].round(2),
+                                }),
+                                column_config={
+                                    "Paid Off": st.column_config.DateColumn("Paid Off", format="MMM YYYY"),
+                                    "Interest": st.column_config.NumberColumn("Interest", format="dollar"),
+                                },
+                                hide_index=True,
+                                use_container_width=True
+                            )
+
+                            viz_tab1, viz_tab2 = st.tabs(["Balances", "Strategy Comparison"])
+
+                            with viz_tab1:
+                                with telemetry.span("figure.payoff_plan"):
+                                    payoff_fig = result_figure(result, "balances", lambda: plot_payoff_plan(
+                                        payoff_balances(plan), debts["Debt"].tolist(), start_date
+                                    ))
+                                with telemetry.span("render.payoff_plan"):
+                                    st.plotly_chart(payoff_fig, use_container_width=True, theme=None)
+
+                            with viz_tab2:
+                                strategies = {"Avalanche": totals["avalanche"], "Snowball": totals["snowball"]}
+                                if plan["strategy"] in ("custom", "optimized"):
+                                    strategies[plan["strategy"].title()] = plan["total_interest"]
+                                strategies_fig = result_figure(result, "strategies", lambda: plot_comparison(
+                                    {"Category": list(strategies), "Amount": list(strategies.values())},
+                                    "Total Interest by Strategy"
+                                ))
+                                st.plotly_chart(strategies_fig, use_container_width=True, theme=None)
 
     # Footer
     st.markdown("""
@@ -933,5 +1240,7 @@ def main():
         </div>
     """, unsafe_allow_html=True)
 
+    timing_panel()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,100 @@
+# Headless amortization core: the loan math, schedule builders, caches and
+# chart builders used by the Streamlit app, importable without Streamlit.
+#
+# Submodules are loaded on first attribute access, so "import loancore" is
+# nearly free; NumPy loads with the engine, pandas and Plotly only once a
+# DataFrame or figure is actually built.
+
+import importlib
+
+_EXPORTS = {
+    "TAPE_COLUMNS": "batch",
+    "price_loans": "batch",
+    "price_tape": "batch",
+    "read_tape": "batch",
+    "ScheduleCache": "cache",
+    "cached_amortization_schedule": "cache",
+    "cached_compact_schedule": "cache",
+    "cached_figure": "cache",
+    "cached_incremental_schedule": "cache",
+    "cached_plot_amortization": "cache",
+    "cached_scenario_trace": "cache",
+    "get_caches": "cache",
+    "schedule_cache_key": "cache",
+    "CompactSchedule": "compact",
+    "MONEY_DTYPES": "compact",
+    "compact_schedule": "compact",
+    "ROUNDING_MODES": "cents",
+    "amortize_cents": "cents",
+    "calculate_amortization_schedule_cents": "cents",
+    "contractual_terms": "cents",
+    "to_cents": "cents",
+    "chart_points": "charts",
+    "csv_download": "export",
+    "write_csv": "export",
+    "write_parquet": "export",
+    "PrepaymentEvents": "events",
+    "prepayment_summary": "events",
+    "IncrementalSchedule": "incremental",
+    "PERCENTILES": "montecarlo",
+    "percentile_bands": "montecarlo",
+    "simulate_rate_paths": "montecarlo",
+    "plot_amortization": "charts",
+    "plot_balance_fan": "charts",
+    "plot_comparison": "charts",
+    "plot_monthly_breakdown": "charts",
+    "plot_extra_payment_sweep": "charts",
+    "plot_payment_breakdown": "charts",
+    "plot_payoff_plan": "charts",
+    "plot_savings_heatmap": "charts",
+    "plot_scenario_balances": "charts",
+    "scenario_balance_trace": "charts",
+    "SCHEDULE_COLUMNS": "schedule",
+    "amortize_arrays": "schedule",
+    "amortize_events": "schedule",
+    "amortize_rate_schedule": "schedule",
+    "amortize_segments": "schedule",
+    "date_labels": "schedule",
+    "calculate_amortization_schedule": "schedule",
+    "calculate_amortization_schedule_reference": "schedule",
+    "calculate_portfolio_amortization": "schedule",
+    "iter_portfolio_schedule_chunks": "schedule",
+    "iter_schedule_chunks": "schedule",
+    "payment_date_labels": "schedule",
+    "payment_dates": "schedule",
+    "extra_payment_rate_grid": "sweep",
+    "extra_payment_sweep": "sweep",
+    "COLORS": "theme",
+    "LOAN_COLORS": "theme",
+    "chart_template": "theme",
+    "rgba": "theme",
+    "MicroBatcher": "service",
+    "create_app": "service",
+    "PAYOFF_STRATEGIES": "planner",
+    "optimize_payoff_order": "planner",
+    "payoff_balances": "planner",
+    "payoff_order": "planner",
+    "plan_payoff": "planner",
+    "RateSchedule": "rates",
+    "arm_rate_schedule": "rates",
+    "payoff_periods": "solver",
+    "remaining_balance": "solver",
+    "solve_payment": "solver",
+    "solve_rate": "solver",
+    "solve_term": "solver",
+    "total_interest": "solver",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
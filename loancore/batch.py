@@ -0,0 +1,278 @@
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from .export import write_csv, write_parquet
+from .schedule import iter_portfolio_schedule_chunks, payment_dates
+from .solver import payoff_periods, solve_payment, total_interest
+
+# Batch pricing of loan tapes. A tape (CSV, Parquet or Arrow IPC) is read a
+# chunk of rows at a time, each chunk is priced in closed form across worker
+# processes, and per-loan summaries are written in tape order as chunks
+# finish. Optional schedules are written by the workers themselves, one part
+# file per chunk, so neither the tape nor its schedules ever have to fit in
+# memory.
+#
+#   python -m loancore.batch tape.csv --summary summary.parquet --schedules schedules/
+
+# Tape columns; principal and annual_rate are required, plus either
+# monthly_payment or term_months for every loan
+TAPE_COLUMNS = ("loan_id", "principal", "annual_rate", "term_months", "monthly_payment", "extra_payment")
+
+SUMMARY_COLUMNS = [
+    "loan_id", "Monthly Payment", "Extra Payment", "Months", "Total Interest", "Total Paid", "Payoff Date", "Status",
+]
+
+_ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+_PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+
+def read_tape(path, chunk_rows=100_000, rename=None):
+    # Yield the tape as DataFrames of at most chunk_rows rows, with only the
+    # tape columns. rename maps tape column names to TAPE_COLUMNS names.
+    # Arrow IPC files are memory-mapped, so only the batches being converted
+    # are paged in; Parquet is read by record batch and CSV by pandas chunks.
+    rename = dict(rename or {})
+    wanted = [source for source, target in rename.items() if target in TAPE_COLUMNS]
+    wanted += [c for c in TAPE_COLUMNS if c not in rename.values()]
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in _ARROW_EXTENSIONS or extension in _PARQUET_EXTENSIONS:
+        batches = _arrow_batches(path, chunk_rows, wanted, extension in _PARQUET_EXTENSIONS)
+        frames = (batch.to_pandas() for batch in batches)
+    else:
+        import pandas as pd
+
+        frames = pd.read_csv(path, chunksize=chunk_rows, usecols=lambda column: column in wanted)
+
+    for frame in frames:
+        yield frame.rename(columns=rename)
+
+
+def _arrow_batches(path, chunk_rows, wanted, parquet):
+    # pyarrow is optional and only needed for Parquet and Arrow tapes
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet and Arrow tapes require pyarrow: pip install pyarrow") from e
+
+    if parquet:
+        tape = pq.ParquetFile(path)
+        yield from tape.iter_batches(batch_size=chunk_rows, columns=[c for c in tape.schema_arrow.names if c in wanted])
+        return
+
+    with pa.memory_map(path, "r") as source:
+        try:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            source.seek(0)
+            batches = pa.ipc.open_stream(source)
+
+        # Re-slice the file's record batches into chunks of chunk_rows rows
+        pending, rows = [], 0
+        for batch in batches:
+            batch = batch.select([c for c in batch.schema.names if c in wanted])
+            pending.append(batch)
+            rows += batch.num_rows
+            while rows >= chunk_rows:
+                table = pa.Table.from_batches(pending)
+                yield table.slice(0, chunk_rows).combine_chunks().to_batches()[0]
+                pending, rows = table.slice(chunk_rows).to_batches(), rows - chunk_rows
+        if rows:
+            yield pa.Table.from_batches(pending).combine_chunks().to_batches()[0]
+
+
+def _column(frame, name, default=np.nan):
+    if name not in frame:
+        return np.full(len(frame), default, dtype=float)
+    # A copy: missing payments are filled in place
+    return frame[name].to_numpy(dtype=float, na_value=default, copy=True)
+
+
+def price_loans(frame, start_date=None, first_row=0):
+    # Per-loan summary of one tape chunk. Loans that cannot be priced (missing
+    # inputs, or a payment that never covers the interest) get a Status
+    # message instead of failing the whole chunk. Also returns the priced
+    # inputs, for building schedules.
+    current_date = start_date if start_date else date.today()
+    n = len(frame)
+    loan_ids = frame["loan_id"].to_numpy() if "loan_id" in frame else np.arange(first_row, first_row + n)
+
+    principals = _column(frame, "principal")
+    annual_rates = _column(frame, "annual_rate")
+    extra_payments = np.nan_to_num(_column(frame, "extra_payment", 0.0))
+    payments = _column(frame, "monthly_payment")
+    missing_payment = np.isnan(payments)
+    if missing_payment.any():
+        payments[missing_payment] = solve_payment(
+            principals[missing_payment], annual_rates[missing_payment], _column(frame, "term_months")[missing_payment]
+        )
+
+    monthly_rates = annual_rates / 100 / 12
+    total_payments = payments + extra_payments
+    inputs_ok = np.isfinite(principals) & np.isfinite(monthly_rates) & np.isfinite(total_payments)
+    inputs_ok &= (principals >= 0) & (monthly_rates >= 0)
+    with np.errstate(invalid="ignore"):
+        covers_interest = (total_payments > principals * monthly_rates) | (principals == 0)
+    valid = inputs_ok & covers_interest
+
+    months = np.zeros(n, dtype=np.int64)
+    interest = np.full(n, np.nan)
+    months[valid] = payoff_periods(principals[valid], monthly_rates[valid], total_payments[valid])
+    interest[valid] = total_interest(principals[valid], monthly_rates[valid], total_payments[valid], months[valid])
+
+    payoff_dates = np.full(n, np.datetime64("NaT"), dtype="datetime64[D]")
+    payoff_dates[valid] = payment_dates(current_date, months[valid])
+    status = np.where(valid, "ok", np.where(inputs_ok, "payment does not cover interest", "invalid input"))
+
+    import pandas as pd
+
+    summary = pd.DataFrame({
+        "loan_id": loan_ids,
+        "Monthly Payment": payments.round(2),
+        "Extra Payment": extra_payments,
+        "Months": months,
+        "Total Interest": interest.round(2),
+        "Total Paid": (np.where(valid, principals, np.nan) + interest).round(2),
+        "Payoff Date": payoff_dates,
+        "Status": status,
+    }, columns=SUMMARY_COLUMNS)
+    priced = {
+        "loan_ids": loan_ids[valid],
+        "principals": principals[valid],
+        "annual_rates": annual_rates[valid],
+        "payments": payments[valid],
+        "extra_payments": extra_payments[valid],
+    }
+    return summary, priced
+
+
+def _price_chunk(job):
+    # Worker: price one chunk and, if asked, write its schedules to a part file
+    index, first_row, frame, options = job
+    summary, priced = price_loans(frame, options["start_date"], first_row)
+
+    if options["schedules"] and len(priced["loan_ids"]):
+        blocks = iter_portfolio_schedule_chunks(
+            priced["principals"], priced["annual_rates"], priced["payments"], priced["extra_payments"],
+            options["start_date"], max_cells=options["max_cells"]
+        )
+        blocks = (_with_loan_ids(block, priced["loan_ids"]) for block in blocks)
+        extension = options["schedule_format"]
+        target = os.path.join(options["schedules"], f"part-{index:05d}.{extension}")
+        (write_parquet if extension == "parquet" else write_csv)(blocks, target)
+    return summary
+
+
+def _with_loan_ids(block, loan_ids):
+    # Portfolio blocks number loans from 0 within the chunk; use the tape ids
+    block["Loan"] = loan_ids[block["Loan"].to_numpy()]
+    return block.rename(columns={"Loan": "loan_id"})
+
+
+def _ordered_map(func, jobs, workers):
+    # Results in job order. At most two jobs per worker are in flight, so the
+    # tape is only read as fast as it is priced.
+    if workers <= 1:
+        yield from map(func, jobs)
+        return
+
+    # spawn rather than fork: the caller may be a threaded server
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending = deque()
+        for job in jobs:
+            pending.append(executor.submit(func, job))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def price_tape(tape, summary, schedules=None, schedule_format="parquet", start_date=None, chunk_rows=100_000,
+               workers=None, rename=None, max_cells=4_000_000, progress=None):
+    # Price every loan on the tape and write the summaries to summary (.csv
+    # or .parquet). With schedules, a directory, each chunk's schedules go to
+    # schedules/part-NNNNN.<schedule_format>. progress, if given, is called as
+    # progress(loans_done). Returns the number of loans written.
+    if schedule_format not in ("parquet", "csv"):
+        raise ValueError(f"Unknown schedule format {schedule_format!r}; expected 'parquet' or 'csv'.")
+    if schedules:
+        os.makedirs(schedules, exist_ok=True)
+    options = {
+        "start_date": start_date if start_date else date.today(),
+        "schedules": schedules,
+        "schedule_format": schedule_format,
+        "max_cells": max_cells,
+    }
+
+    def jobs():
+        first_row = 0
+        for index, frame in enumerate(read_tape(tape, chunk_rows, rename)):
+            yield index, first_row, frame, options
+            first_row += len(frame)
+
+    def summaries():
+        done = 0
+        for chunk in _ordered_map(_price_chunk, jobs(), workers or os.cpu_count() or 1):
+            done += len(chunk)
+            if progress:
+                progress(done)
+            yield chunk
+
+    if os.path.splitext(summary)[1].lower() in _PARQUET_EXTENSIONS:
+        return write_parquet(summaries(), summary)
+    return write_csv(summaries(), summary)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m loancore.batch",
+        description="Price every loan on a tape and write per-loan summaries and, optionally, schedules."
+    )
+    parser.add_argument("tape", help="loan tape: .csv, .parquet, or Arrow IPC (.arrow, .feather)")
+    parser.add_argument("--summary", required=True, help="summary output, .csv or .parquet")
+    parser.add_argument("--schedules", help="directory for per-chunk schedule files")
+    parser.add_argument("--schedule-format", choices=("parquet", "csv"), default="parquet")
+    parser.add_argument("--start-date", type=date.fromisoformat, help="loan start date, YYYY-MM-DD (default: today)")
+    parser.add_argument("--chunk-rows", type=int, default=100_000, help="loans per chunk (default: %(default)s)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--column", action="append", default=[], metavar="TAPE_NAME=COLUMN",
+                        help=f"read a tape column as one of {', '.join(TAPE_COLUMNS)}; repeatable")
+    args = parser.parse_args(argv)
+
+    rename = {}
+    for mapping in args.column:
+        source, _, target = mapping.partition("=")
+        if target not in TAPE_COLUMNS:
+            parser.error(f"--column {mapping}: expected TAPE_NAME=COLUMN with COLUMN one of {', '.join(TAPE_COLUMNS)}")
+        rename[source] = target
+
+    start = time.perf_counter()
+
+    def report(done):
+        elapsed = time.perf_counter() - start
+        print(f"\rpriced {done:,} loans ({done / max(elapsed, 1e-9):,.0f}/s)", end="", file=sys.stderr, flush=True)
+
+    loans = price_tape(
+        args.tape, args.summary, args.schedules, args.schedule_format, args.start_date, args.chunk_rows,
+        args.workers, rename, progress=report
+    )
+    print(f"\nwrote {loans:,} loan summaries to {args.summary} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    # Run through the package module so worker processes can import _price_chunk
+    from loancore.batch import main as batch_main
+
+    sys.exit(batch_main())
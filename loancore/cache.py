@@ -0,0 +1,162 @@
+from collections import OrderedDict
+from datetime import date
+import threading
+
+import numpy as np
+
+class ScheduleCache:
+    # Bounded, thread-safe LRU cache. The process-wide caches below are shared
+    # by every session on the server; cached values are handed out as-is, so
+    # callers must not mutate them.
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Compute outside the lock so one slow miss does not block other users
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def get(self, key, default=None):
+        # Look up without computing; a found entry becomes the most recent
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+# Process-wide caches. They live in this module rather than in the Streamlit
+# script, which is re-executed on every rerun, so they survive reruns and are
+# shared by every session and worker thread in the process. What-if engines
+# keep up to IncrementalSchedule.max_paths schedules each, so they get their
+# own small cache: 8 engines hold about as many paths as the schedule cache.
+_caches = {
+    "schedule": ScheduleCache(maxsize=256),
+    "incremental": ScheduleCache(maxsize=8),
+    "figure": ScheduleCache(maxsize=64),
+}
+
+def get_caches():
+    return _caches
+
+def _normalize(value):
+    # Cache key component: floats rounded so that inputs differing only by
+    # float noise share an entry, dates as ISO strings
+    if isinstance(value, (float, np.floating)):
+        return round(float(value), 6)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+def schedule_cache_key(principal, annual_rate, monthly_payment, extra_payment=0, start_date=None, rate_schedule=None,
+                       events=None):
+    start_date = start_date if start_date else date.today()
+    key = tuple(_normalize(v) for v in (principal, annual_rate, monthly_payment, extra_payment, start_date))
+    if rate_schedule is not None:
+        key += (("rates",) + rate_schedule.key(),)
+    if events:
+        key += (("events",) + events.key(),)
+    return key
+
+def cached_compact_schedule(principal, annual_rate, monthly_payment, extra_payment=0, start_date=None,
+                            rate_schedule=None, events=None):
+    # Schedules are kept as CompactSchedule columns rather than DataFrames:
+    # a fraction of the memory per entry, and read-only, so the frames
+    # handed out cannot alter the cached values
+    from .compact import compact_schedule
+
+    start_date = start_date if start_date else date.today()
+    key = ("compact",) + schedule_cache_key(
+        principal, annual_rate, monthly_payment, extra_payment, start_date, rate_schedule, events
+    )
+    return get_caches()["schedule"].get_or_compute(
+        key,
+        lambda: compact_schedule(
+            principal, annual_rate, monthly_payment, extra_payment, start_date, rate_schedule, events
+        )
+    )
+
+def cached_amortization_schedule(principal, annual_rate, monthly_payment, extra_payment=0, start_date=None,
+                                 rate_schedule=None, events=None):
+    # Same schedule as calculate_amortization_schedule; the DataFrame wraps
+    # the cached columns without copying them. The total interest is the sum
+    # of the rounded Interest column (CompactSchedule.total_interest).
+    schedule = cached_compact_schedule(
+        principal, annual_rate, monthly_payment, extra_payment, start_date, rate_schedule, events
+    )
+    return schedule.to_pandas(), len(schedule), schedule.total_interest
+
+def cached_incremental_schedule(principal, annual_rate, monthly_payment):
+    # What-if engine for one baseline loan, shared so that changing only the
+    # extra payment reuses the kept baseline
+    from .incremental import IncrementalSchedule
+
+    key = schedule_cache_key(principal, annual_rate, monthly_payment, 0, date.min)
+    return get_caches()["incremental"].get_or_compute(
+        key,
+        lambda: IncrementalSchedule(principal, annual_rate, monthly_payment)
+    )
+
+def cached_plot_amortization(principal, annual_rate, monthly_payment, extra_payment=0, start_date=None, loan_type="mortgage",
+                             rate_schedule=None):
+    from .charts import plot_amortization
+
+    start_date = start_date if start_date else date.today()
+    key = ("plot_amortization", loan_type) + schedule_cache_key(
+        principal, annual_rate, monthly_payment, extra_payment, start_date, rate_schedule
+    )
+    return get_caches()["figure"].get_or_compute(
+        key,
+        lambda: plot_amortization(
+            cached_amortization_schedule(
+                principal, annual_rate, monthly_payment, extra_payment, start_date, rate_schedule
+            )[0],
+            loan_type
+        )
+    )
+
+def cached_scenario_trace(principal, annual_rate, monthly_payment, extra_payment=0, start_date=None, name="Scenario"):
+    # Balance trace for one compared scenario, so that adding a scenario only
+    # builds that scenario's schedule and trace
+    from .charts import scenario_balance_trace
+
+    start_date = start_date if start_date else date.today()
+    key = ("scenario_trace", name) + schedule_cache_key(principal, annual_rate, monthly_payment, extra_payment, start_date)
+    return get_caches()["figure"].get_or_compute(
+        key,
+        lambda: scenario_balance_trace(
+            cached_amortization_schedule(principal, annual_rate, monthly_payment, extra_payment, start_date)[0],
+            name
+        )
+    )
+
+def cached_figure(builder, *args):
+    # Figures built from scalar inputs only, keyed on the builder and its arguments
+    key = (builder.__name__,) + tuple(_normalize(v) for v in args)
+    return get_caches()["figure"].get_or_compute(key, lambda: builder(*args))
@@ -0,0 +1,127 @@
+from datetime import date
+
+import numpy as np
+
+from .schedule import SCHEDULE_COLUMNS, payment_dates
+from .solver import payoff_periods, solve_payment
+
+# Cent-exact amortization. Money is held as integer cents in int64 arrays and
+# interest is rounded to the cent every period, the way lenders post it, so
+# every row reconciles exactly. The recurrence is no longer linear once each
+# period is rounded, so instead of the closed form the loop runs over periods
+# with every loan of the batch advanced together in NumPy.
+
+ROUNDING_MODES = ("half_even", "half_up")
+
+
+def to_cents(amounts, rounding="half_even"):
+    return _round(np.asarray(amounts, dtype=float) * 100, rounding)
+
+
+def _round(values, rounding):
+    # Snap away float noise first so that exact half cents round by the rule
+    values = np.round(values, 6)
+    if rounding == "half_even":
+        return np.rint(values).astype(np.int64)
+    if rounding == "half_up":
+        return np.floor(values + 0.5).astype(np.int64)
+    raise ValueError(f"Unknown rounding mode {rounding!r}; expected one of {ROUNDING_MODES}.")
+
+
+def contractual_terms(principals, annual_rates, monthly_payments):
+    # Term each payment was quoted for, 0 where there is none: the whole
+    # number of months whose level payment rounds to this one and whose
+    # neighbours' do not (small loans, where several terms share a payment,
+    # keep the plain payoff). A quoted payment is off by up to half a cent and
+    # interest is rounded every month, so the balance can run a few dollars
+    # past the term; the lender collects them with the last scheduled payment.
+    principals, annual_rates, monthly_payments = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (principals, annual_rates, monthly_payments))
+    )
+    monthly_rates = annual_rates / 100 / 12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        periods = np.where(
+            monthly_rates > 0,
+            -np.log1p(-monthly_rates * principals / monthly_payments) / np.log1p(monthly_rates),
+            principals / monthly_payments
+        )
+    valid = np.isfinite(periods) & (periods >= 0.5)
+    terms = np.where(valid, np.round(periods), 1).astype(np.int64)
+    quoted = to_cents(monthly_payments)
+
+    def quotes(months):
+        return to_cents(solve_payment(principals, annual_rates, np.maximum(months, 1))) == quoted
+
+    matches = valid & quotes(terms) & ~quotes(terms + 1) & ((terms == 1) | ~quotes(terms - 1))
+    return np.where(matches, terms, 0)
+
+
+def amortize_cents(principals, annual_rates, monthly_payments, extra_payments=0, rounding="half_even",
+                   include_schedule=True, term_months=None):
+    # Amortize a batch of loans in integer cents. Each period the interest is
+    # rounded to the cent; the final payment is adjusted to exactly clear the
+    # balance, and the payment due in month term_months (derived with
+    # contractual_terms when not given; 0 for none) clears whatever is left.
+    # Returns months and total interest (cents) per loan and, with
+    # include_schedule, loans x periods int64 arrays of payment, interest,
+    # principal and closing balance (zero past each loan's payoff).
+    principals, annual_rates, monthly_payments, extra_payments = (
+        np.atleast_1d(np.asarray(a, dtype=float))
+        for a in np.broadcast_arrays(principals, annual_rates, monthly_payments, extra_payments)
+    )
+    monthly_rates = annual_rates / 100 / 12
+    balance = to_cents(principals, rounding)
+    payment = to_cents(monthly_payments, rounding) + to_cents(extra_payments, rounding)
+
+    # The float closed form rejects payments that never cover the interest
+    payoff_periods(balance / 100, monthly_rates, payment / 100)
+    if term_months is None:
+        term_months = contractual_terms(principals, annual_rates, monthly_payments)
+    term_months = np.broadcast_to(np.asarray(term_months, dtype=np.int64), balance.shape)
+
+    months = np.zeros(len(balance), dtype=np.int64)
+    total_interest = np.zeros(len(balance), dtype=np.int64)
+    columns = {name: [] for name in ("payment", "interest", "principal", "balance")}
+
+    while (active := balance > 0).any():
+        interest = np.where(active, _round(balance * monthly_rates, rounding), 0)
+        # Final payment: whatever clears the balance plus this period's interest
+        due = balance + interest
+        paid = np.where(active, np.where(months + 1 == term_months, due, np.minimum(payment, due)), 0)
+        principal_paid = paid - interest
+        balance = balance - principal_paid
+        months += active
+        total_interest += interest
+
+        if include_schedule:
+            for name, values in zip(columns, (paid, interest, principal_paid, balance)):
+                columns[name].append(values)
+
+    result = {"months": months, "total_interest": total_interest}
+    if include_schedule:
+        empty = np.zeros((len(months), 0), dtype=np.int64)
+        result.update({
+            name: np.stack(values, axis=1) if values else empty for name, values in columns.items()
+        })
+    return result
+
+
+def calculate_amortization_schedule_cents(principal, annual_rate, monthly_payment, extra_payment=0, start_date=None,
+                                          rounding="half_even", term_months=None):
+    # Cent-exact counterpart of calculate_amortization_schedule: the same
+    # DataFrame layout, with every amount an exact number of cents
+    import pandas as pd
+
+    result = amortize_cents(principal, annual_rate, monthly_payment, extra_payment, rounding, term_months=term_months)
+    months = int(result["months"][0])
+    current_date = start_date if start_date else date.today()
+
+    df = pd.DataFrame({
+        "Payment #": np.arange(1, months + 1),
+        "Date": payment_dates(current_date, np.arange(1, months + 1)),
+        "Total Payment": result["payment"][0, :months] / 100,
+        "Interest": result["interest"][0, :months] / 100,
+        "Principal": result["principal"][0, :months] / 100,
+        "Remaining Balance": result["balance"][0, :months] / 100,
+    }, columns=SCHEDULE_COLUMNS)
+    return df, months, int(result["total_interest"][0]) / 100
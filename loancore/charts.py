@@ -0,0 +1,369 @@
+import numpy as np
+
+from .theme import COLORS, TEXT_COLOR, chart_template, loan_colors, rgba
+
+# Plotly figure builders. pandas and Plotly are imported inside each builder
+# so that only callers that actually draw charts pay for them. Shared styling
+# comes from the registered "loancore" template (see theme.py), so each
+# figure only carries its data, titles and colors.
+
+def chart_points(df, max_points=240, aggregate="auto"):
+    # Reduce a schedule to the points actually drawn. Every point kept is a
+    # real schedule row, so hover values stay exact.
+    #   aggregate="year": one point per year of payments (plus the first and last)
+    #   aggregate="lttb": Largest-Triangle-Three-Buckets on the balance curve
+    #   aggregate="auto": all rows when within max_points, else yearly, then
+    #                     LTTB when even the yearly points exceed max_points
+    #   aggregate=None:   every row
+    import pandas as pd
+
+    points = pd.DataFrame({
+        "Payment #": df["Payment #"].to_numpy(),
+        "Date": df["Date"].to_numpy(),
+        "Remaining Balance": df["Remaining Balance"].to_numpy(),
+        "Cumulative Interest": df["Interest"].cumsum().to_numpy(),
+    })
+    if aggregate is None or (aggregate == "auto" and len(points) <= max_points):
+        return points
+
+    if aggregate in ("auto", "year"):
+        yearly = np.unique(np.concatenate(([0], np.arange(11, len(points), 12), [len(points) - 1])))
+        points = points.iloc[yearly].reset_index(drop=True)
+        if aggregate == "year" or len(points) <= max_points:
+            return points
+
+    keep = _lttb_indices(points["Payment #"].to_numpy(dtype=float), points["Remaining Balance"].to_numpy(), max_points)
+    return points.iloc[keep].reset_index(drop=True)
+
+def _lttb_indices(x, y, max_points):
+    # Largest-Triangle-Three-Buckets: keep the first and last points and, in
+    # each bucket in between, the point forming the largest triangle with the
+    # previously kept point and the average of the next bucket
+    n = len(x)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    keep = [0]
+    for b in range(max_points - 2):
+        start, stop = edges[b], max(edges[b + 1], edges[b] + 1)
+        next_stop = edges[b + 2] if b + 2 < len(edges) else n
+        avg_x = x[stop:next_stop].mean() if next_stop > stop else x[-1]
+        avg_y = y[stop:next_stop].mean() if next_stop > stop else y[-1]
+        prev = keep[-1]
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:stop] - y[prev]) - (x[prev] - x[start:stop]) * (avg_y - y[prev])
+        )
+        keep.append(start + int(area.argmax()))
+    keep.append(n - 1)
+    return np.unique(keep)
+
+# Horizontal legend above the plot area, right-aligned
+_TOP_LEGEND = dict(orientation='h', y=1.02, x=1, xanchor='right', yanchor='bottom')
+
+def plot_amortization(df, loan_type="mortgage", max_points=240, aggregate="auto", use_webgl=False):
+    import plotly.graph_objects as go
+
+    from .schedule import date_labels
+
+    selected_colors = loan_colors(loan_type)
+
+    # Only the reduced set of points is sent to the browser
+    points = chart_points(df, max_points, aggregate)
+    hover_dates = date_labels(points["Date"])
+    scatter = go.Scattergl if use_webgl else go.Scatter
+    hovertemplate = "<b>Payment #%{x}</b> (%{customdata})<br>Amount: $%{y:,.2f}<extra></extra>"
+
+    fig = go.Figure(
+        data=[
+            scatter(
+                x=points["Payment #"],
+                y=points["Remaining Balance"],
+                customdata=hover_dates,
+                name="Remaining Balance",
+                line=dict(color=selected_colors["balance"], width=4),
+                fill='tozeroy',
+                fillcolor=rgba(selected_colors["balance"], 0.1),
+                hovertemplate=hovertemplate
+            ),
+            scatter(
+                x=points["Payment #"],
+                y=points["Cumulative Interest"],
+                customdata=hover_dates,
+                name="Cumulative Interest",
+                line=dict(color=selected_colors["interest"], width=4),
+                fill='tozeroy',
+                fillcolor=rgba(selected_colors["interest"], 0.1),
+                hovertemplate=hovertemplate
+            ),
+        ],
+        layout=dict(
+            template=chart_template(),
+            title=dict(text="Loan Amortization Visualization", font_size=24),
+            xaxis_title_text="Payment Number",
+            yaxis_title_text="Amount ($)",
+            legend=_TOP_LEGEND,
+            hovermode="x unified",
+            margin=dict(l=40, r=40, t=80, b=40),
+            height=500
+        )
+    )
+
+    return fig
+
+def plot_payment_breakdown(principal, total_interest):
+    import plotly.graph_objects as go
+
+    return go.Figure(
+        data=[go.Pie(
+            labels=['Principal', 'Interest'],
+            values=[principal, total_interest],
+            hole=.4,
+            textinfo='label+percent',
+            marker_colors=[COLORS["blue"], COLORS["red"]]
+        )],
+        layout=dict(template=chart_template(), title_text="Total Payment Breakdown")
+    )
+
+def plot_monthly_breakdown(monthly_payment, extra_payment=0):
+    import plotly.graph_objects as go
+
+    # Zero amounts are left out
+    bars = [
+        (category, amount, color)
+        for category, amount, color in (
+            ("Regular Payment", monthly_payment, COLORS["blue"]),
+            ("Extra Payment", extra_payment, COLORS["green"]),
+        )
+        if amount > 0
+    ]
+    categories, amounts, colors = zip(*bars) if bars else ((), (), ())
+
+    return go.Figure(
+        data=[go.Bar(
+            x=categories,
+            y=amounts,
+            marker_color=colors,
+            text=amounts,
+            texttemplate='$%{text:.2f}',
+            textposition='outside'
+        )],
+        layout=dict(
+            template=chart_template(),
+            title_text="Monthly Payment Breakdown",
+            xaxis=dict(title_text="", showgrid=False),
+            yaxis_title_text="Amount ($)",
+            showlegend=False
+        )
+    )
+
+
+# Bar colors for the categories plot_comparison knows; others are blue
+COMPARISON_COLORS = {
+    'Old Payment': COLORS["red"],
+    'New Payment': COLORS["blue"],
+    'Old Interest': COLORS["orange"],
+    'New Interest': COLORS["green"],
+}
+
+def plot_comparison(data, title="Payment Comparison"):
+    # data has "Category" and "Amount" columns (a DataFrame or a dict of lists)
+    import plotly.graph_objects as go
+
+    categories = list(data["Category"])
+    return go.Figure(
+        data=[go.Bar(
+            x=categories,
+            y=list(data["Amount"]),
+            marker_color=[COMPARISON_COLORS.get(category, COLORS["blue"]) for category in categories],
+            text=list(data["Amount"]),
+            texttemplate='$%{text:,.2f}',
+            textposition='outside'
+        )],
+        layout=dict(
+            template=chart_template(),
+            title_text=title,
+            xaxis=dict(title_text="", showgrid=False),
+            yaxis_title_text="Amount ($)",
+            showlegend=False
+        )
+    )
+
+def scenario_balance_trace(df, name, max_points=240):
+    # One scenario's remaining balance, as a trace for plot_scenario_balances.
+    # A plain dict, so it can be cached and reused across figures.
+    from .schedule import date_labels
+
+    points = chart_points(df, max_points)
+    return dict(
+        type="scatter",
+        x=points["Payment #"].to_numpy(),
+        y=points["Remaining Balance"].to_numpy(),
+        customdata=date_labels(points["Date"]),
+        name=name,
+        line=dict(width=3),
+        hovertemplate=f"<b>{name}</b><br>Payment #%{{x}} (%{{customdata}})<br>Balance: $%{{y:,.2f}}<extra></extra>"
+    )
+
+def plot_scenario_balances(traces, title="Remaining Balance by Scenario"):
+    # Overlaid balance curves; colors follow the template's colorway in order
+    import plotly.graph_objects as go
+
+    return go.Figure(
+        data=list(traces),
+        layout=dict(
+            template=chart_template(),
+            title_text=title,
+            xaxis_title_text="Payment Number",
+            yaxis_title_text="Remaining Balance ($)",
+            legend=_TOP_LEGEND,
+            height=500
+        )
+    )
+
+def plot_payoff_plan(balances, names, start_date, max_points=240):
+    # Stacked remaining balance of every debt over a payoff plan. balances has
+    # one row per month starting today (see planner.payoff_balances); long
+    # plans are thinned to at most max_points months, keeping the last.
+    import plotly.graph_objects as go
+
+    from .schedule import date_labels, payment_dates
+
+    months = np.arange(len(balances))
+    keep = months[::max(1, -(-len(months) // max_points))]
+    if keep[-1] != months[-1]:
+        keep = np.append(keep, months[-1])
+    hover_dates = date_labels(payment_dates(start_date, keep))
+
+    return go.Figure(
+        data=[
+            go.Scatter(
+                x=keep,
+                y=balances[keep, i],
+                customdata=hover_dates,
+                name=name,
+                stackgroup="debts",
+                line=dict(width=1),
+                hovertemplate=f"<b>{name}</b><br>Month %{{x}} (%{{customdata}})<br>Balance: $%{{y:,.2f}}<extra></extra>"
+            )
+            for i, name in enumerate(names)
+        ],
+        layout=dict(
+            template=chart_template(),
+            title_text="Debt Balances Over the Payoff Plan",
+            xaxis_title_text="Month",
+            yaxis_title_text="Remaining Balance ($)",
+            legend=_TOP_LEGEND,
+            height=500
+        )
+    )
+
+def plot_extra_payment_sweep(sweep):
+    import plotly.graph_objects as go
+
+    return go.Figure(
+        data=[
+            go.Scatter(
+                x=sweep["Extra Payment"],
+                y=sweep["Interest Saved"],
+                name="Interest Saved",
+                line=dict(color=COLORS["green"], width=3),
+                hovertemplate="<b>+$%{x:,.0f}/month</b><br>Interest saved: $%{y:,.2f}<extra></extra>"
+            ),
+            go.Scatter(
+                x=sweep["Extra Payment"],
+                y=sweep["Months Saved"],
+                name="Months Saved",
+                yaxis="y2",
+                line=dict(color=COLORS["purple"], width=3, dash="dot"),
+                hovertemplate="<b>+$%{x:,.0f}/month</b><br>Months saved: %{y}<extra></extra>"
+            ),
+        ],
+        layout=dict(
+            template=chart_template(),
+            title_text="Savings by Extra Monthly Payment",
+            xaxis_title_text="Extra Monthly Payment ($)",
+            yaxis_title_text="Interest Saved ($)",
+            # The template styles xaxis and yaxis only; the second axis is styled here
+            yaxis2=dict(
+                title=dict(text="Months Saved", font=dict(size=14, color=TEXT_COLOR)),
+                tickfont=dict(size=12, color=TEXT_COLOR),
+                overlaying="y",
+                side="right",
+                showgrid=False
+            ),
+            legend=_TOP_LEGEND,
+            hovermode="x unified"
+        )
+    )
+
+def plot_savings_heatmap(grid):
+    import plotly.graph_objects as go
+
+    return go.Figure(
+        data=go.Heatmap(
+            x=grid["extra_payments"],
+            y=grid["annual_rates"],
+            z=grid["interest_saved"],
+            customdata=grid["months_saved"],
+            colorscale="Tealgrn",
+            colorbar=dict(title="Saved ($)"),
+            hovertemplate="Rate %{y:.2f}% · +$%{x:,.0f}/month<br>Interest saved: $%{z:,.0f}<br>Months saved: %{customdata}<extra></extra>"
+        ),
+        layout=dict(
+            template=chart_template(),
+            title_text="Interest Saved by Rate and Extra Payment",
+            xaxis_title_text="Extra Monthly Payment ($)",
+            yaxis_title_text="Annual Interest Rate (%)"
+        )
+    )
+
+def plot_balance_fan(result, loan_type="mortgage"):
+    # Percentile fan of the remaining balance across simulated rate paths
+    import plotly.graph_objects as go
+
+    from .montecarlo import percentile_bands
+
+    color = loan_colors(loan_type)["balance"]
+    bands = percentile_bands(result["balance"])
+    months = np.arange(1, result["balance"].shape[1] + 1)
+
+    traces = []
+    # Outer band first so the inner band and median draw on top
+    for low, high, opacity in ((5, 95, 0.12), (25, 75, 0.25)):
+        traces.append(go.Scatter(
+            x=months,
+            y=bands[high],
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo="skip"
+        ))
+        traces.append(go.Scatter(
+            x=months,
+            y=bands[low],
+            name=f"{low}th–{high}th percentile",
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor=rgba(color, opacity),
+            hoverinfo="skip"
+        ))
+
+    traces.append(go.Scatter(
+        x=months,
+        y=bands[50],
+        name="Median",
+        line=dict(color=color, width=3),
+        hovertemplate="<b>Payment #%{x}</b><br>Median balance: $%{y:,.2f}<extra></extra>"
+    ))
+
+    return go.Figure(
+        data=traces,
+        layout=dict(
+            template=chart_template(),
+            title_text="Remaining Balance Across Rate Scenarios",
+            xaxis_title_text="Payment Number",
+            yaxis_title_text="Amount ($)",
+            legend=_TOP_LEGEND,
+            height=450
+        )
+    )
@@ -0,0 +1,137 @@
+from datetime import date
+
+import numpy as np
+
+from .cents import to_cents
+from .schedule import SCHEDULE_COLUMNS, _amortize, payment_dates
+
+# Compact columnar schedules. A CompactSchedule keeps only the four money
+# columns as typed arrays (float64, float32 or int64 cents); payment numbers
+# and dates are derived from the start date and the first payment number when
+# asked for. Conversion to pandas or Arrow wraps the stored arrays without
+# copying them, so many schedules can be held for a session or a batch and
+# still be displayed or exported cheaply.
+
+MONEY_DTYPES = ("float64", "float32", "cents")
+
+_MONEY_FIELDS = ("payment", "interest", "principal", "balance")
+
+
+class CompactSchedule:
+    def __init__(self, arrays, start_date=None, first_payment=1, money_dtype="float64", index_dtype="int32"):
+        # arrays: amortize_arrays-style dict of per-period payment, interest,
+        # principal and balance; amounts are rounded to the cent once here.
+        # In cents, interest and balance are rounded and the rest derived from
+        # them, so every row reconciles and principal adds up to the loan.
+        if money_dtype not in MONEY_DTYPES:
+            raise ValueError(f"Unknown money dtype {money_dtype!r}; expected one of {MONEY_DTYPES}.")
+        self.start_date = start_date if start_date else date.today()
+        self.first_payment = int(first_payment)
+        self.money_dtype = money_dtype
+        self.index_dtype = np.dtype(index_dtype)
+
+        if money_dtype == "cents":
+            columns = _reconciled_cents(arrays)
+        else:
+            columns = {
+                name: np.asarray(arrays[name], dtype=float).round(2).astype(money_dtype, copy=False)
+                for name in _MONEY_FIELDS
+            }
+        self.columns = {}
+        for name in _MONEY_FIELDS:
+            # Shared with every DataFrame and Arrow table built from it
+            columns[name].flags.writeable = False
+            self.columns[name] = columns[name]
+        self.total_interest = self._total_interest()
+
+    def __len__(self):
+        return len(self.columns["payment"])
+
+    def __getitem__(self, rows):
+        # A contiguous run of payments; the arrays are views, not copies
+        if not isinstance(rows, slice) or rows.step not in (None, 1):
+            raise TypeError("CompactSchedule only supports contiguous slices.")
+        begin, stop, _ = rows.indices(len(self))
+        part = object.__new__(CompactSchedule)
+        part.start_date = self.start_date
+        part.first_payment = self.first_payment + begin
+        part.money_dtype = self.money_dtype
+        part.index_dtype = self.index_dtype
+        part.columns = {name: values[begin:stop] for name, values in self.columns.items()}
+        part.total_interest = part._total_interest()
+        return part
+
+    def _total_interest(self):
+        # Sum of the stored interest column, i.e. of the rows as displayed, for
+        # whole schedules and slices alike. This is what
+        # cached_amortization_schedule returns; it can differ by a few cents
+        # from calculate_amortization_schedule's sum of unrounded interest.
+        interest = self.columns["interest"]
+        cents = interest if self.money_dtype == "cents" else to_cents(interest)
+        return int(cents.sum()) / 100
+
+    @property
+    def nbytes(self):
+        # Memory held by the stored columns
+        return sum(values.nbytes for values in self.columns.values())
+
+    def payment_numbers(self):
+        return np.arange(self.first_payment, self.first_payment + len(self), dtype=self.index_dtype)
+
+    def dates(self):
+        # datetime64[D] due dates, computed on demand
+        return payment_dates(self.start_date, self.payment_numbers())
+
+    def money(self, name, dollars=True):
+        # One money column. Float storage and raw cents come back without a
+        # copy; cents converted to dollars are a new float64 array.
+        values = self.columns[name]
+        if self.money_dtype == "cents" and dollars:
+            return values / 100
+        return values
+
+    def to_pandas(self, dollars=True):
+        # DataFrame in the SCHEDULE_COLUMNS layout. The money columns wrap the
+        # stored arrays (read-only) unless cents are converted to dollars.
+        import pandas as pd
+
+        return pd.DataFrame(dict(zip(SCHEDULE_COLUMNS, (
+            self.payment_numbers(),
+            self.dates(),
+            *(self.money(name, dollars) for name in _MONEY_FIELDS),
+        ))), copy=False)
+
+    def to_arrow(self, dollars=True):
+        # pyarrow Table in the SCHEDULE_COLUMNS layout; numeric columns are
+        # wrapped without a copy. pyarrow is optional and only needed here.
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("Arrow conversion requires pyarrow: pip install pyarrow") from e
+
+        return pa.table(dict(zip(SCHEDULE_COLUMNS, (
+            pa.array(self.payment_numbers()),
+            pa.array(self.dates()),
+            *(pa.array(self.money(name, dollars)) for name in _MONEY_FIELDS),
+        ))))
+
+
+def _reconciled_cents(arrays):
+    # Money columns in int64 cents with payment = interest + principal on
+    # every row: the balances and interest are rounded, principal is what the
+    # balance went down by and the payment is the two together
+    balance = to_cents(arrays["balance"])
+    interest = to_cents(arrays["interest"])
+    opening = np.empty_like(balance)
+    if len(balance):
+        opening[0] = to_cents(np.asarray(arrays["balance"][0]) + np.asarray(arrays["principal"][0]))
+        opening[1:] = balance[:-1]
+    principal = opening - balance
+    return {"payment": interest + principal, "interest": interest, "principal": principal, "balance": balance}
+
+
+def compact_schedule(principal, annual_rate, monthly_payment, extra_payment=0, start_date=None, rate_schedule=None,
+                     events=None, money_dtype="float64", index_dtype="int32"):
+    # Counterpart of calculate_amortization_schedule returning a CompactSchedule
+    arrays = _amortize(principal, annual_rate, monthly_payment, extra_payment, rate_schedule, events)
+    return CompactSchedule(arrays, start_date, money_dtype=money_dtype, index_dtype=index_dtype)
@@ -0,0 +1,54 @@
+import io
+
+# Streaming schedule export. Writers consume an iterable of schedule
+# DataFrames (iter_schedule_chunks, iter_portfolio_schedule_chunks) and write
+# each block as it arrives, so memory is bounded by one block and output starts
+# before the whole schedule has been computed.
+
+
+def write_csv(chunks, target):
+    # target is a path or a text file object; returns the number of rows written
+    if isinstance(target, (str, bytes)) or hasattr(target, "__fspath__"):
+        with open(target, "w", newline="", encoding="utf-8") as handle:
+            return write_csv(chunks, handle)
+
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(target, header=i == 0, index=False)
+        rows += len(chunk)
+    return rows
+
+
+def write_parquet(chunks, target, compression="snappy"):
+    # target is a path or a binary file object; each block becomes a row group.
+    # pyarrow is optional and only needed here.
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export requires pyarrow: pip install pyarrow") from e
+
+    rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema, compression=compression)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def csv_download(make_chunks):
+    # Deferred data for st.download_button: the schedule is only generated and
+    # encoded when the user actually clicks download
+    def build():
+        buffer = io.StringIO()
+        write_csv(make_chunks(), buffer)
+        return buffer.getvalue().encode("utf-8")
+
+    return build
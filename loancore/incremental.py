@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from datetime import date
+import threading
+
+import numpy as np
+
+from .schedule import _schedule_frame, amortize_arrays, amortize_segments
+
+# Incremental what-if engine. The baseline schedule and the accelerated path
+# for each extra payment are computed once and kept; scenarios with a lump sum
+# or a rate change reuse the matching path up to the first affected period and
+# only evaluate the rest, segment by segment in closed form.
+
+_FIELDS = ("payment", "interest", "principal", "balance")
+
+
+class IncrementalSchedule:
+    def __init__(self, principal, annual_rate, monthly_payment, max_paths=32):
+        self.principal = principal
+        self.annual_rate = annual_rate
+        self.monthly_payment = monthly_payment
+        self.max_paths = max_paths
+        self._paths = OrderedDict()
+        # Engines are shared by every session through the schedule cache
+        self._lock = threading.Lock()
+        self.baseline = self.path(0.0)
+
+    def path(self, extra_payment=0.0):
+        # Schedule arrays with a constant extra payment, kept per extra amount
+        key = round(float(extra_payment), 6)
+        with self._lock:
+            arrays = self._paths.get(key)
+            if arrays is not None:
+                self._paths.move_to_end(key)
+                return arrays
+
+        # Computed outside the lock, like ScheduleCache misses
+        arrays = amortize_arrays(self.principal, self.annual_rate, self.monthly_payment, extra_payment)
+        arrays["total_interest"] = float(arrays["interest"].sum())
+        with self._lock:
+            self._paths[key] = arrays
+            self._paths.move_to_end(key)
+            while len(self._paths) > self.max_paths:
+                self._paths.popitem(last=False)
+        return arrays
+
+    def scenario(self, extra_payment=0.0, lump_sums=None, rate_changes=None, events=None):
+        # Schedule arrays for a what-if scenario. lump_sums maps payment
+        # numbers (1-based) to one-off extra principal paid with that payment;
+        # rate_changes maps payment numbers to the annual rate (%) applying
+        # from that payment on, with the monthly payment unchanged; events is
+        # a PrepaymentEvents applied on top of both.
+        lump_sums = {int(k) - 1: v for k, v in (lump_sums or {}).items() if v}
+        rate_changes = {int(k) - 1: v for k, v in (rate_changes or {}).items()}
+        if events:
+            extra_payment = extra_payment + events.monthly_extra(self.monthly_payment)
+        base = self.path(extra_payment)
+        starts = sorted(set(lump_sums) | set(rate_changes))[:1]
+        if events and events.next_period(0) is not None:
+            starts.append(events.next_period(0))
+        if not starts or min(starts) >= base["months"]:
+            return base
+
+        # Everything before the first event is identical to the cached path;
+        # only the rest is evaluated
+        first = min(starts)
+        balance = self.principal if first == 0 else float(base["balance"][first - 1])
+        tail = amortize_segments(
+            balance, self.annual_rate, self.monthly_payment, extra_payment,
+            rate_changes=rate_changes, lump_sums=lump_sums, start_period=first, events=events
+        )
+
+        arrays = {name: np.concatenate([base[name][:first], tail[name]]) for name in _FIELDS}
+        arrays["months"] = first + tail["months"]
+        arrays["total_interest"] = float(arrays["interest"].sum())
+        return arrays
+
+    def compare(self, extra_payment=0.0, lump_sums=None, rate_changes=None, events=None):
+        # Savings of a scenario against the kept baseline
+        arrays = self.scenario(extra_payment, lump_sums, rate_changes, events)
+        return {
+            "original_months": self.baseline["months"],
+            "original_interest": self.baseline["total_interest"],
+            "new_months": arrays["months"],
+            "new_interest": arrays["total_interest"],
+            "months_saved": self.baseline["months"] - arrays["months"],
+            "interest_saved": self.baseline["total_interest"] - arrays["total_interest"],
+        }
+
+    def schedule(self, extra_payment=0.0, lump_sums=None, rate_changes=None, events=None, start_date=None):
+        # Scenario as a schedule DataFrame, laid out like calculate_amortization_schedule
+        arrays = self.scenario(extra_payment, lump_sums, rate_changes, events)
+        current_date = start_date if start_date else date.today()
+        df = _schedule_frame(arrays, np.arange(1, arrays["months"] + 1), current_date)
+        return df, arrays["months"], arrays["total_interest"]
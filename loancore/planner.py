@@ -0,0 +1,219 @@
+from datetime import date
+
+import numpy as np
+
+from .schedule import payment_dates
+from .solver import remaining_balance
+
+# Multi-debt payoff planning. Every debt gets its minimum payment each month
+# and whatever is left of the monthly budget goes to one focus debt, the first
+# unpaid debt in the payoff order. When a debt is paid off its minimum joins
+# the surplus, and the unused part of its final payment goes to the next debts
+# in the order that same month.
+#
+# Between two payoff dates every payment is constant, so the simulation jumps
+# from one payoff to the next with the closed-form balance instead of looping
+# month by month: at most one step per debt. The simulation runs on a batch of
+# payoff orders at once, which is what makes the order search fast.
+
+PAYOFF_STRATEGIES = ("avalanche", "snowball", "custom", "optimized")
+
+
+def _inputs(balances, annual_rates, minimum_payments, budget):
+    balances, annual_rates, minimum_payments = (
+        np.asarray(values, dtype=float).ravel() for values in (balances, annual_rates, minimum_payments)
+    )
+    if not len(balances) == len(annual_rates) == len(minimum_payments):
+        raise ValueError("Every debt needs a balance, a rate and a minimum payment.")
+    if np.any(balances < 0) or np.any(annual_rates < 0) or np.any(minimum_payments < 0):
+        raise ValueError("Balances, rates and minimum payments cannot be negative.")
+    if budget < minimum_payments[balances > 0].sum():
+        raise ValueError("The monthly budget must cover every minimum payment.")
+    return balances, annual_rates / 100 / 12, minimum_payments
+
+
+def payoff_order(balances, annual_rates, strategy="avalanche", order=None):
+    # Debt indices in the order they are targeted:
+    #   avalanche: highest rate first (smaller balance breaks ties)
+    #   snowball:  smallest balance first (higher rate breaks ties)
+    #   custom:    the given order, a permutation of the debt indices
+    balances = np.asarray(balances, dtype=float)
+    annual_rates = np.asarray(annual_rates, dtype=float)
+    if strategy == "avalanche":
+        return np.lexsort((balances, -annual_rates))
+    if strategy == "snowball":
+        return np.lexsort((-annual_rates, balances))
+    if strategy == "custom":
+        if order is None or sorted(np.asarray(order).tolist()) != list(range(len(balances))):
+            raise ValueError("A custom order must list every debt exactly once.")
+        return np.asarray(order, dtype=np.int64)
+    raise ValueError(f"Unknown strategy {strategy!r}; expected one of {', '.join(PAYOFF_STRATEGIES)}.")
+
+
+def _periods(balance, monthly_rate, payment, active):
+    # Whole months until each payment retires its balance; inf where it never does
+    covers = active & (payment > balance * monthly_rate)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        periods = np.where(
+            monthly_rate > 0,
+            -np.log1p(-monthly_rate * balance / payment) / np.log1p(monthly_rate),
+            balance / payment
+        )
+    return np.where(covers, np.maximum(np.ceil(periods - 1e-9), 1), np.inf)
+
+
+def _simulate(balances, monthly_rates, minimum_payments, budget, ranks, record=False):
+    # Simulate one payoff order per row of ranks, where ranks[c, i] is debt i's
+    # position in order c. Returns the amount paid to each debt and the month
+    # it was paid off (0 for debts that never are), per order. With record,
+    # also the constant-payment segments of the first order, for balances.
+    shape = ranks.shape
+    candidates, n = shape
+    rows = np.arange(candidates)
+    balance = np.array(np.broadcast_to(balances, shape))
+    paid = np.zeros(shape)
+    payoff_month = np.zeros(shape, dtype=np.int64)
+    month = np.zeros(candidates, dtype=np.int64)
+    stalled = np.zeros(candidates, dtype=bool)
+    segments = []
+
+    def focus_of(active):
+        return np.where(active, ranks, n).argmin(axis=1)
+
+    # Every step pays off at least one debt
+    for _ in range(n + 1):
+        active = balance > 0
+        running = active.any(axis=1) & ~stalled
+        if not running.any():
+            break
+
+        payments = np.where(active, minimum_payments, 0.0)
+        surplus = np.where(running, budget - payments.sum(axis=1), 0.0)
+        payments[rows, focus_of(active)] += surplus
+
+        periods = _periods(balance, monthly_rates, payments, active)
+        step = periods.min(axis=1)
+        stalled |= running & ~np.isfinite(step)
+        step = np.where(running & ~stalled, step, 0).astype(np.int64)
+        if record:
+            segments.append((int(month[0]), int(step[0]), balance[0].copy(), payments[0].copy()))
+
+        # Jump to the next payoff; the debts paid off that month overshoot
+        # zero by the unused part of their final payment
+        new_balance = remaining_balance(balance, monthly_rates, payments, step[:, None])
+        finished = active & (step[:, None] > 0) & ((periods == step[:, None]) | (new_balance < 1e-6))
+        leftover = np.where(finished, np.maximum(-new_balance, 0.0), 0.0)
+        balance = np.where(finished, 0.0, new_balance)
+        paid += payments * step[:, None] - leftover
+        month += step
+        payoff_month = np.where(finished, month[:, None], payoff_month)
+
+        # The unused money goes to the next debts in the order, that month
+        pool = leftover.sum(axis=1)
+        while np.any(pool > 1e-9):
+            active = balance > 0
+            receiving = active.any(axis=1) & (pool > 1e-9)
+            if not receiving.any():
+                break
+            focus = focus_of(active)
+            applied = np.where(receiving, np.minimum(pool, balance[rows, focus]), 0.0)
+            balance[rows, focus] -= applied
+            paid[rows, focus] += applied
+            pool -= applied
+            cleared = receiving & (balance[rows, focus] <= 1e-9)
+            balance[rows[cleared], focus[cleared]] = 0.0
+            payoff_month[rows[cleared], focus[cleared]] = month[cleared]
+
+    stalled |= (balance > 0).any(axis=1)
+    return paid, payoff_month, stalled, segments
+
+
+def _ranks(orders):
+    orders = np.atleast_2d(orders)
+    ranks = np.empty_like(orders)
+    np.put_along_axis(ranks, orders, np.arange(orders.shape[1]), axis=1)
+    return ranks
+
+
+def _total_interest(balances, monthly_rates, minimum_payments, budget, orders):
+    # Total interest of every order; inf for orders that never finish
+    paid, _, stalled, _ = _simulate(balances, monthly_rates, minimum_payments, budget, _ranks(orders))
+    return np.where(stalled, np.inf, paid.sum(axis=1) - balances.sum())
+
+
+def plan_payoff(balances, annual_rates, minimum_payments, budget, strategy="avalanche", order=None, start_date=None):
+    # Payoff plan for a household's debts under a total monthly budget.
+    # Returns the order, each debt's payoff month, payoff date and interest,
+    # the total interest and the months until debt-free.
+    balances, monthly_rates, minimum_payments = _inputs(balances, annual_rates, minimum_payments, budget)
+    if strategy == "optimized":
+        return optimize_payoff_order(balances, annual_rates, minimum_payments, budget, start_date=start_date)
+    order = payoff_order(balances, annual_rates, strategy, order)
+
+    paid, payoff_month, stalled, segments = _simulate(
+        balances, monthly_rates, minimum_payments, budget, _ranks(order), record=True
+    )
+    if stalled[0]:
+        raise ValueError("The budget never pays off every debt: some payments do not cover their interest.")
+    paid, payoff_month = paid[0], payoff_month[0]
+    return {
+        "strategy": strategy,
+        "order": order,
+        "payoff_month": payoff_month,
+        "payoff_date": payment_dates(start_date if start_date else date.today(), payoff_month),
+        "interest": paid - balances,
+        "total_interest": float((paid - balances).sum()),
+        "months": int(payoff_month.max(initial=0)),
+        "monthly_rates": monthly_rates,
+        "segments": segments,
+    }
+
+
+def payoff_balances(plan):
+    # Month-end balance of every debt, months + 1 rows starting with today's,
+    # evaluated in closed form within each constant-payment segment
+    segments = plan["segments"]
+    n = len(plan["order"])
+    balances = np.zeros((plan["months"] + 1, n))
+    if segments:
+        balances[0] = segments[0][2]
+    for index, (start, step, opening, payments) in enumerate(segments):
+        if step == 0:
+            continue
+        within = np.arange(1, step)[:, None]
+        balances[start + 1:start + step] = np.maximum(
+            remaining_balance(opening, plan["monthly_rates"], payments, within), 0.0
+        )
+        # The payoff month ends with the opening balances of the next segment
+        balances[start + step] = segments[index + 1][2] if index + 1 < len(segments) else 0.0
+    return balances
+
+
+def optimize_payoff_order(balances, annual_rates, minimum_payments, budget, start_date=None, max_rounds=100):
+    # Payoff order with the least total interest. Starts from the better of
+    # avalanche and snowball, then repeatedly moves one debt to the position
+    # that lowers the interest most; every one of a round's n(n - 1) moves is
+    # simulated in a single batch. Stops when no move helps.
+    balances, monthly_rates, minimum_payments = _inputs(balances, annual_rates, minimum_payments, budget)
+    n = len(balances)
+    starts = np.array([payoff_order(balances, annual_rates, "avalanche"), payoff_order(balances, annual_rates, "snowball")])
+    interest = _total_interest(balances, monthly_rates, minimum_payments, budget, starts)
+    best, best_interest = starts[interest.argmin()], interest.min()
+    evaluated = len(starts)
+
+    if n > 1:
+        # Every (from, to) insertion move, as index arrays into the current order
+        sources, targets = (a.ravel() for a in np.meshgrid(np.arange(n), np.arange(n), indexing="ij"))
+        moves = [(s, t) for s, t in zip(sources.tolist(), targets.tolist()) if s != t]
+        for _ in range(max_rounds):
+            candidates = np.array([np.insert(np.delete(best, s), t, best[s]) for s, t in moves])
+            interest = _total_interest(balances, monthly_rates, minimum_payments, budget, candidates)
+            evaluated += len(candidates)
+            if not interest.min() < best_interest - 1e-6:
+                break
+            best, best_interest = candidates[interest.argmin()], interest.min()
+
+    plan = plan_payoff(balances, annual_rates, minimum_payments, budget, "custom", best, start_date)
+    plan["strategy"] = "optimized"
+    plan["orders_evaluated"] = evaluated
+    return plan
@@ -0,0 +1,62 @@
+# Piecewise rate schedules for adjustable-rate loans. A RateSchedule maps
+# payment numbers to the annual rate (%) the index calls for from that payment
+# on; caps and the floor are applied in order when the resets are resolved
+# against the loan's initial rate. The schedule engine then amortizes each
+# segment between resets in closed form.
+
+
+class RateSchedule:
+    def __init__(self, changes, periodic_cap=None, lifetime_cap=None, floor=None, recast=True):
+        # changes: {payment number (1-based): annual rate %}
+        # periodic_cap: largest move at a single reset, in percentage points
+        # lifetime_cap: largest rise above the initial rate, in percentage points
+        # recast: re-amortize the payment over the remaining term at each reset
+        self.changes = {int(k): float(v) for k, v in dict(changes).items()}
+        self.periodic_cap = periodic_cap
+        self.lifetime_cap = lifetime_cap
+        self.floor = floor
+        self.recast = recast
+
+    def resets(self, initial_rate):
+        # [(0-based period, annual rate)] with caps and floor applied
+        resolved = []
+        rate = initial_rate
+        for payment_number in sorted(self.changes):
+            target = self.changes[payment_number]
+            if self.periodic_cap is not None:
+                target = min(max(target, rate - self.periodic_cap), rate + self.periodic_cap)
+            if self.lifetime_cap is not None:
+                target = min(target, initial_rate + self.lifetime_cap)
+            if self.floor is not None:
+                target = max(target, self.floor)
+            rate = target
+            resolved.append((payment_number - 1, rate))
+        return resolved
+
+    def key(self):
+        # Hashable identity for cache keys
+        return (
+            tuple(sorted(self.changes.items())), self.periodic_cap, self.lifetime_cap, self.floor, self.recast
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, RateSchedule) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+
+def arm_rate_schedule(index_rates, fixed_months=60, reset_every=12, margin=0.0, periodic_cap=2.0,
+                      lifetime_cap=5.0, floor=None, recast=True):
+    # Rate schedule for an ARM such as a 5/1: the first reset comes after
+    # fixed_months, then every reset_every months. index_rates gives the index
+    # level at each reset (a single value applies to every reset up to
+    # 40 years); the loan rate is index + margin within the caps.
+    if isinstance(index_rates, (int, float)):
+        count = max(0, (480 - fixed_months - 1) // reset_every + 1)
+        index_rates = [index_rates] * count
+    changes = {
+        fixed_months + 1 + i * reset_every: index + margin
+        for i, index in enumerate(index_rates)
+    }
+    return RateSchedule(changes, periodic_cap, lifetime_cap, floor, recast)
@@ -0,0 +1,365 @@
+import calendar
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+from .solver import payoff_periods, remaining_balance, solve_payment, total_interest
+
+# Schedule construction. pandas is imported inside the functions that build
+# DataFrames so that importing the package stays cheap for batch workers.
+
+# Column layout shared by every amortization schedule
+SCHEDULE_COLUMNS = ["Payment #", "Date", "Total Payment", "Interest", "Principal", "Remaining Balance"]
+
+# Month abbreviations used for payment date labels
+_MONTH_ABBR = [date(2000, m, 1).strftime("%b") for m in range(1, 13)]
+
+def calculate_amortization_schedule_reference(principal, annual_rate, monthly_payment, extra_payment=0, start_date=None):
+    # Month-by-month reference implementation, kept for equivalence checks
+    # against the vectorized engine in calculate_amortization_schedule
+    monthly_rate = annual_rate / 100 / 12
+    balance = principal
+    schedule = []
+    total_interest = 0
+    month = 0
+    current_date = start_date if start_date else date.today()
+
+    while balance > 0:
+        interest = balance * monthly_rate
+        total_interest += interest
+        principal_payment = monthly_payment + extra_payment - interest
+
+        # Treat floating point residue as paid off rather than rolling it into
+        # an extra near-zero payment
+        if principal_payment > balance - 1e-6:
+            principal_payment = balance
+            # The final payment only covers what is left, extra payment included
+            monthly_payment = interest + principal_payment - extra_payment
+
+        balance -= principal_payment
+        month += 1
+
+        # Calculate date for this payment, on the start date's day of month or
+        # the last day of a shorter month
+        year = current_date.year + (current_date.month - 1 + month) // 12
+        payment_month = (current_date.month - 1 + month) % 12 + 1
+        payment_date = date(year, payment_month, min(current_date.day, calendar.monthrange(year, payment_month)[1]))
+
+        schedule.append([
+            month,
+            payment_date,
+            round(monthly_payment + extra_payment, 2),
+            round(interest, 2),
+            round(principal_payment, 2),
+            round(balance, 2)
+        ])
+
+    import pandas as pd
+
+    df = pd.DataFrame(
+        schedule,
+        columns=SCHEDULE_COLUMNS
+    )
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df, month, total_interest
+
+def payment_dates(start_date, payment_numbers):
+    # Due date of each payment number counted from start_date, as
+    # datetime64[D]. Payments fall on the start date's day of month, clamped
+    # to the last day of shorter months (Jan 31 -> Feb 28 -> Mar 31).
+    start = np.datetime64(start_date, "D")
+    first_of_start = start.astype("datetime64[M]")
+    months = first_of_start + np.asarray(payment_numbers)
+    first_days = months.astype("datetime64[D]")
+    month_lengths = (months + 1).astype("datetime64[D]") - first_days
+    return first_days + np.minimum(start - first_of_start.astype("datetime64[D]"), month_lengths - 1)
+
+def date_labels(dates):
+    # "Mon YYYY" label for each date; every distinct month is formatted once
+    months, inverse = np.unique(np.asarray(dates).astype("datetime64[M]").astype(np.int64), return_inverse=True)
+    labels = np.array([_month_label(m) for m in months.tolist()], dtype=object)
+    return labels[inverse.reshape(-1)]
+
+@lru_cache(maxsize=4096)
+def _month_label(month):
+    # Label for a month counted from January 1970, kept across calls
+    return f"{_MONTH_ABBR[month % 12]} {1970 + month // 12}"
+
+def payment_date_labels(start_date, months):
+    # "Mon YYYY" labels for payments 1..months after start_date
+    return date_labels(payment_dates(start_date, np.arange(1, months + 1)))
+
+def amortize_arrays(principal, annual_rate, monthly_payment, extra_payment=0, periods=None):
+    # Vectorized amortization: every period is evaluated at once from the
+    # closed-form annuity recurrence instead of stepping month by month.
+    # periods optionally selects which 0-based periods to evaluate, which lets
+    # a long schedule be produced in independent blocks.
+    monthly_rate = annual_rate / 100 / 12
+    payment = monthly_payment + extra_payment
+    months = payoff_periods(principal, monthly_rate, payment)
+    periods = np.arange(months) if periods is None else np.asarray(periods)
+
+    opening = remaining_balance(principal, monthly_rate, payment, periods)
+    interest = opening * monthly_rate
+    principal_paid = payment - interest
+
+    # The final payment only covers what is left of the balance
+    final = periods == months - 1
+    principal_paid = np.where(final, opening, principal_paid)
+    closing = np.where(final, 0.0, opening - principal_paid)
+
+    return {
+        "payment": interest + principal_paid,
+        "interest": interest,
+        "principal": principal_paid,
+        "balance": closing,
+        "months": months,
+    }
+
+def amortize_segments(balance, annual_rate, payment, extra_payment=0, rate_changes=None, lump_sums=None,
+                      recast_term=None, start_period=0, events=None):
+    # Amortize from a given balance and period through a series of events,
+    # jumping in closed form from one event to the next. rate_changes maps
+    # 0-based periods to the annual rate from then on; lump_sums maps periods
+    # to a one-off payment adjustment (extra principal, or negative for a
+    # reduced payment); events, a PrepaymentEvents, adds its events as the
+    # walk reaches them. With recast_term, the payment is re-amortized over
+    # the months left of recast_term at each rate change.
+    rate_changes = rate_changes or {}
+    lump_sums = {p: v for p, v in (lump_sums or {}).items() if v}
+    fixed = sorted(set(rate_changes) | set(lump_sums))
+    pieces = []
+    period = start_period
+
+    def next_event(after):
+        # First event period at or after the given one, None if none
+        upcoming = [e for e in fixed if e >= after]
+        if events:
+            upcoming.append(events.next_period(after))
+        return min((e for e in upcoming if e is not None), default=None)
+
+    while balance > 0:
+        if period in rate_changes:
+            annual_rate = rate_changes[period]
+            if recast_term is not None:
+                payment = solve_payment(balance, annual_rate, max(recast_term - period, 1))
+
+        if period in lump_sums or (events and events.next_period(period) == period):
+            # Event period on its own; the payment may fall short of the
+            # interest (a skipped payment), which the closed form cannot take
+            interest = balance * annual_rate / 100 / 12
+            if events and events.skipped(period):
+                paid = 0.0
+            else:
+                adjustment = lump_sums.get(period, 0.0) + (events.adjustment(period) if events else 0.0)
+                paid = min(payment + extra_payment + adjustment, balance + interest)
+            closing = balance + interest - paid
+            if closing < 1e-6:
+                closing = 0.0
+            pieces.append({
+                "payment": np.array([paid]),
+                "interest": np.array([interest]),
+                "principal": np.array([paid - interest]),
+                "balance": np.array([closing]),
+            })
+            balance = closing
+            period += 1
+            continue
+
+        # Closed form up to the next event or payoff
+        upcoming = next_event(period + 1)
+        months = payoff_periods(balance, annual_rate / 100 / 12, payment + extra_payment)
+        count = min(upcoming - period, months) if upcoming is not None else months
+        segment = amortize_arrays(balance, annual_rate, payment, extra_payment, np.arange(count))
+        pieces.append(segment)
+        balance = float(segment["balance"][-1])
+        period += count
+
+    arrays = {
+        name: np.concatenate([piece[name] for piece in pieces]) if pieces else np.zeros(0)
+        for name in ("payment", "interest", "principal", "balance")
+    }
+    arrays["months"] = period - start_period
+    return arrays
+
+def amortize_rate_schedule(principal, annual_rate, monthly_payment, rate_schedule, extra_payment=0, term_months=None,
+                           lump_sums=None, events=None):
+    # Schedule arrays under a piecewise RateSchedule. Each segment between
+    # resets is evaluated in closed form; term_months (by default the term the
+    # initial payment implies) is what recast payments amortize over.
+    if term_months is None:
+        term_months = payoff_periods(principal, annual_rate / 100 / 12, monthly_payment)
+
+    # A reset that leaves the rate unchanged is a no-op unless extra payments
+    # make the recast payment differ, so it does not need its own segment
+    rate_changes = {}
+    rate = annual_rate
+    for period, reset_rate in rate_schedule.resets(annual_rate):
+        if reset_rate != rate or (rate_schedule.recast and (extra_payment or lump_sums or events)):
+            rate_changes[period] = reset_rate
+        rate = reset_rate
+    return amortize_segments(
+        principal, annual_rate, monthly_payment, extra_payment,
+        rate_changes=rate_changes,
+        lump_sums=lump_sums,
+        recast_term=term_months if rate_schedule.recast else None,
+        events=events
+    )
+
+def amortize_events(principal, annual_rate, monthly_payment, events, extra_payment=0, rate_schedule=None):
+    # Schedule arrays under PrepaymentEvents (and optionally a RateSchedule):
+    # closed-form segments between the events
+    extra_payment = extra_payment + events.monthly_extra(monthly_payment)
+    if rate_schedule is not None:
+        return amortize_rate_schedule(principal, annual_rate, monthly_payment, rate_schedule, extra_payment,
+                                      events=events)
+    return amortize_segments(principal, annual_rate, monthly_payment, extra_payment, events=events)
+
+def _schedule_frame(arrays, payment_numbers, start_date):
+    # Schedule DataFrame for the given payment numbers from amortize_arrays output
+    import pandas as pd
+
+    # The dict is already in SCHEDULE_COLUMNS order, and every array is new,
+    # so pandas neither reorders nor copies: that is most of the build time
+    return pd.DataFrame({
+        "Payment #": payment_numbers,
+        "Date": payment_dates(start_date, payment_numbers),
+        "Total Payment": arrays["payment"].round(2),
+        "Interest": arrays["interest"].round(2),
+        "Principal": arrays["principal"].round(2),
+        "Remaining Balance": arrays["balance"].round(2),
+    }, copy=False)
+
+def calculate_amortization_schedule(principal, annual_rate, monthly_payment, extra_payment=0, start_date=None,
+                                    rate_schedule=None, events=None):
+    # rate_schedule, a RateSchedule, makes the rate piecewise (ARM resets);
+    # events, a PrepaymentEvents, adds lump sums and other irregular payments
+    arrays = _amortize(principal, annual_rate, monthly_payment, extra_payment, rate_schedule, events)
+    months = arrays["months"]
+    current_date = start_date if start_date else date.today()
+
+    df = _schedule_frame(arrays, np.arange(1, months + 1), current_date)
+    return df, months, float(arrays["interest"].sum())
+
+def _amortize(principal, annual_rate, monthly_payment, extra_payment=0, rate_schedule=None, events=None):
+    # Pick the cheapest engine for the inputs
+    if events:
+        return amortize_events(principal, annual_rate, monthly_payment, events, extra_payment, rate_schedule)
+    if rate_schedule is not None:
+        return amortize_rate_schedule(principal, annual_rate, monthly_payment, rate_schedule, extra_payment)
+    return amortize_arrays(principal, annual_rate, monthly_payment, extra_payment)
+
+def iter_schedule_chunks(principal, annual_rate, monthly_payment, extra_payment=0, start_date=None, chunk_size=1200,
+                         rate_schedule=None, events=None):
+    # Yield the schedule as DataFrames of at most chunk_size payments. Each
+    # block comes straight from the closed form, so the first rows are
+    # available before the rest are computed and memory stays bounded.
+    current_date = start_date if start_date else date.today()
+    if rate_schedule is not None or events:
+        # Segments between events are already closed form; slice the result
+        arrays = _amortize(principal, annual_rate, monthly_payment, extra_payment, rate_schedule, events)
+        for begin in range(0, arrays["months"], chunk_size):
+            block = slice(begin, begin + chunk_size)
+            periods = np.arange(begin, min(begin + chunk_size, arrays["months"]))
+            yield _schedule_frame({name: values[block] for name, values in arrays.items() if name != "months"},
+                                  periods + 1, current_date)
+        return
+
+    monthly_rate = annual_rate / 100 / 12
+    months = payoff_periods(principal, monthly_rate, monthly_payment + extra_payment)
+
+    for begin in range(0, months, chunk_size):
+        periods = np.arange(begin, min(begin + chunk_size, months))
+        arrays = amortize_arrays(principal, annual_rate, monthly_payment, extra_payment, periods)
+        yield _schedule_frame(arrays, periods + 1, current_date)
+
+def _portfolio_inputs(principals, annual_rates, monthly_payments, extra_payments):
+    # Broadcast portfolio inputs to 1-D float arrays and solve every term
+    principals, annual_rates, monthly_payments, extra_payments = (
+        np.atleast_1d(np.asarray(a, dtype=float))
+        for a in np.broadcast_arrays(principals, annual_rates, monthly_payments, extra_payments)
+    )
+    monthly_rates = annual_rates / 100 / 12
+    payments = monthly_payments + extra_payments
+    return principals, monthly_rates, payments, payoff_periods(principals, monthly_rates, payments)
+
+def calculate_portfolio_amortization(principals, annual_rates, monthly_payments, extra_payments=0,
+                                     start_date=None, include_schedule=False, max_cells=4_000_000, progress=None):
+    # Price a whole portfolio at once. Summaries come straight from the closed
+    # form; the optional stacked schedule is built as loans x periods arrays,
+    # a block of loans at a time so memory stays under max_cells values.
+    # progress, if given, is called as progress(loans_done, loans_total).
+    import pandas as pd
+
+    principals, monthly_rates, payments, months = _portfolio_inputs(
+        principals, annual_rates, monthly_payments, extra_payments
+    )
+    current_date = start_date if start_date else date.today()
+
+    total_interests = total_interest(principals, monthly_rates, payments, months)
+
+    summary = pd.DataFrame({
+        "Loan": np.arange(len(principals)),
+        "Months": months,
+        "Total Interest": total_interests,
+        "Payoff Date": payment_dates(current_date, months),
+    })
+    if not include_schedule:
+        if progress:
+            progress(len(principals), len(principals))
+        return summary
+
+    blocks = list(_iter_portfolio_blocks(principals, monthly_rates, payments, months, current_date, max_cells, progress))
+    schedule = pd.concat(blocks, ignore_index=True) if blocks else pd.DataFrame(columns=["Loan"] + SCHEDULE_COLUMNS)
+    return summary, schedule
+
+def iter_portfolio_schedule_chunks(principals, annual_rates, monthly_payments, extra_payments=0,
+                                   start_date=None, max_cells=4_000_000, progress=None):
+    # Stream the stacked portfolio schedule one block of loans at a time
+    principals, monthly_rates, payments, months = _portfolio_inputs(
+        principals, annual_rates, monthly_payments, extra_payments
+    )
+    current_date = start_date if start_date else date.today()
+    yield from _iter_portfolio_blocks(principals, monthly_rates, payments, months, current_date, max_cells, progress)
+
+def _iter_portfolio_blocks(principals, monthly_rates, payments, months, start_date, max_cells, progress):
+    block_size = max(1, max_cells // max(int(months.max(initial=0)), 1))
+    for begin in range(0, len(principals), block_size):
+        block = slice(begin, begin + block_size)
+        yield _portfolio_schedule_block(
+            begin, principals[block], monthly_rates[block], payments[block], months[block], start_date
+        )
+        if progress:
+            progress(min(begin + block_size, len(principals)), len(principals))
+
+def _portfolio_schedule_block(first_loan, principals, monthly_rates, payments, months, start_date):
+    # Long-format schedule rows for one block of loans
+    import pandas as pd
+
+    periods = np.arange(int(months.max(initial=0)))
+    live = periods[None, :] < months[:, None]
+
+    rates = monthly_rates[:, None]
+    opening = remaining_balance(principals[:, None], rates, payments[:, None], periods[None, :])
+    interest = opening * rates
+    principal_paid = payments[:, None] - interest
+
+    # The final payment of each loan only covers what is left of its balance
+    loans = np.flatnonzero(months > 0)
+    last = months[loans] - 1
+    principal_paid[loans, last] = opening[loans, last]
+    closing = opening - principal_paid
+    closing[loans, last] = 0.0
+
+    payment_numbers = np.broadcast_to(periods + 1, live.shape)[live]
+    dates = payment_dates(start_date, periods + 1)
+    return pd.DataFrame({
+        "Loan": np.repeat(first_loan + np.arange(len(months)), months),
+        "Payment #": payment_numbers,
+        "Date": dates[payment_numbers - 1],
+        "Total Payment": (interest + principal_paid)[live].round(2),
+        "Interest": interest[live].round(2),
+        "Principal": principal_paid[live].round(2),
+        "Remaining Balance": closing[live].round(2),
+    })
@@ -0,0 +1,379 @@
+import argparse
+import asyncio
+from datetime import date
+import json
+
+import numpy as np
+
+from . import telemetry
+from .cache import cached_amortization_schedule
+from .solver import payoff_periods, solve_payment, total_interest
+
+# HTTP pricing service. A dependency-free ASGI app exposing the calculator's
+# three modes (payment plan, loan term, interest saved) plus full schedules.
+# Concurrent requests to the same endpoint are micro-batched: each batcher
+# waits a couple of milliseconds for company, then prices everything queued
+# in one vectorized call. Schedules go through the shared schedule cache.
+#
+#   python -m loancore.service --port 8000           (needs uvicorn)
+#   curl -d '{"principal": 250000, "annual_rate": 5.5, "term_months": 360}' localhost:8000/payment
+
+
+class RequestError(ValueError):
+    # Invalid request; reported to the client as a 400 with the message
+    pass
+
+
+class MicroBatcher:
+    # Collects concurrent requests of one kind and prices them together.
+    # price takes a list of parameter dicts and returns one result dict each.
+    def __init__(self, name, price, max_batch=256, max_delay=0.002):
+        self.name = name
+        self.price = price
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.requests = 0
+        self.batches = 0
+        self._queue = None
+        self._task = None
+
+    async def submit(self, params):
+        if self._queue is None:
+            # Created on first use so that they belong to the server's event loop
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((params, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            # Give other requests already on their way a moment to join
+            await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            self.requests += len(batch)
+            self.batches += 1
+            try:
+                with telemetry.span(f"service.{self.name}"):
+                    results = self.price([params for params, _ in batch])
+            except Exception:
+                # Pricing is per row, so this should not happen; if it does,
+                # price each request alone so one cannot fail its neighbours
+                results = [self._price_one(params) for params, _ in batch]
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _price_one(self, params):
+        try:
+            return self.price([params])[0]
+        except Exception as e:
+            return e
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+# Input bounds, checked before a request joins a batch
+MAX_AMOUNT = 1e12
+MAX_ANNUAL_RATE = 100.0
+MAX_TERM_MONTHS = 1200
+
+# Rows are only priced when the closed form is good to the cent: the loan
+# pays off within MAX_TERM_MONTHS, and principal * (1 + r)^months, which
+# scales the float rounding error of every balance, stays below this
+MAX_COMPOUNDED = 1e14
+
+
+def _number(params, name, default=None, minimum=0.0, maximum=MAX_AMOUNT):
+    value = params.get(name, default)
+    if value is None:
+        raise RequestError(f"Missing required field {name!r}.")
+    if isinstance(value, bool):
+        raise RequestError(f"Field {name!r} must be a number.")
+    try:
+        value = float(value)
+    except (TypeError, ValueError, OverflowError):
+        raise RequestError(f"Field {name!r} must be a number.") from None
+    if not np.isfinite(value) or not minimum <= value <= maximum:
+        raise RequestError(f"Field {name!r} must be a number from {minimum:g} to {maximum:g}.")
+    return value
+
+
+def _term_months(params):
+    months = _number(params, "term_months", minimum=1, maximum=MAX_TERM_MONTHS)
+    if months != int(months):
+        raise RequestError("Field 'term_months' must be a whole number of months.")
+    return int(months)
+
+
+def _annual_rate(params):
+    return _number(params, "annual_rate", maximum=MAX_ANNUAL_RATE)
+
+
+def _arrays(requests, *names):
+    return [np.array([params[name] for params in requests], dtype=float) for name in names]
+
+
+def _rows(valid, **columns):
+    # Column arrays -> one result dict per request, with plain Python numbers.
+    # Rows that could not be priced get an error instead, like the Status of
+    # batch.price_loans, so one request never fails the others in its batch.
+    names = list(columns)
+    values = zip(*(np.asarray(c).tolist() for c in columns.values()))
+    return [
+        dict(zip(names, row)) if ok else {"error": "These inputs cannot be priced to the cent within the service's limits."}
+        for ok, row in zip(valid.tolist(), values)
+    ]
+
+
+def _precise(principals, monthly_rates, months):
+    # Whether the closed form over these months is good to the cent
+    with np.errstate(all="ignore"):
+        compounded = np.log(np.maximum(principals, 1.0)) + months * np.log1p(monthly_rates)
+    return (months <= MAX_TERM_MONTHS) & (compounded < np.log(MAX_COMPOUNDED))
+
+
+def _payoff(principals, monthly_rates, payments):
+    # Months and interest for the rows the payment retires; months 0 and NaN
+    # interest elsewhere, and the mask of priced rows
+    with np.errstate(all="ignore"):
+        valid = np.isfinite(principals) & np.isfinite(monthly_rates) & np.isfinite(payments)
+        valid &= (payments > principals * monthly_rates) | (principals == 0)
+    months = np.zeros(len(principals), dtype=np.int64)
+    interest = np.full(len(principals), np.nan)
+    months[valid] = payoff_periods(principals[valid], monthly_rates[valid], payments[valid])
+    valid &= _precise(principals, monthly_rates, months)
+    interest[valid] = total_interest(principals[valid], monthly_rates[valid], payments[valid], months[valid])
+    return months, interest, valid & np.isfinite(interest)
+
+
+# Request validation, one per endpoint. Each returns the normalized parameters
+# that the batch pricing function expects, or raises RequestError.
+
+def _payment_params(params):
+    parsed = {
+        "principal": _number(params, "principal"),
+        "annual_rate": _annual_rate(params),
+        "term_months": _term_months(params),
+        "extra_payment": _number(params, "extra_payment", 0.0),
+    }
+    if not np.isfinite(solve_payment(parsed["principal"], parsed["annual_rate"], parsed["term_months"])):
+        raise RequestError("These inputs do not give a finite monthly payment.")
+    return parsed
+
+
+def _term_params(params):
+    parsed = {
+        "principal": _number(params, "principal"),
+        "annual_rate": _annual_rate(params),
+        "monthly_payment": _number(params, "monthly_payment", minimum=0.01),
+        "extra_payment": _number(params, "extra_payment", 0.0),
+    }
+    interest = parsed["principal"] * parsed["annual_rate"] / 100 / 12
+    if parsed["principal"] > 0 and parsed["monthly_payment"] + parsed["extra_payment"] <= interest:
+        raise RequestError("Monthly payment must be greater than the monthly interest.")
+    return parsed
+
+
+# Batch pricing, one vectorized engine call per batch
+
+def _price_payments(requests):
+    principals, rates, terms, extras = _arrays(requests, "principal", "annual_rate", "term_months", "extra_payment")
+    payments = solve_payment(principals, rates, terms)
+    monthly_rates = rates / 100 / 12
+    months, interest, valid = _payoff(principals, monthly_rates, payments + extras)
+    with np.errstate(all="ignore"):
+        base_interest = total_interest(principals, monthly_rates, payments, terms.astype(np.int64))
+    valid &= np.isfinite(payments) & np.isfinite(base_interest) & _precise(principals, monthly_rates, terms)
+    return _rows(
+        valid,
+        monthly_payment=payments.round(2),
+        months=months,
+        total_interest=interest.round(2),
+        total_paid=(principals + interest).round(2),
+        interest_saved=(base_interest - interest).round(2),
+    )
+
+
+def _price_terms(requests):
+    principals, rates, payments, extras = _arrays(requests, "principal", "annual_rate", "monthly_payment", "extra_payment")
+    monthly_rates = rates / 100 / 12
+    months, interest, valid = _payoff(principals, monthly_rates, payments + extras)
+    return _rows(valid, months=months, total_interest=interest.round(2), total_paid=(principals + interest).round(2))
+
+
+def _price_interest_saved(requests):
+    principals, rates, terms, extras = _arrays(requests, "principal", "annual_rate", "term_months", "extra_payment")
+    payments = solve_payment(principals, rates, terms)
+    monthly_rates = rates / 100 / 12
+    with np.errstate(all="ignore"):
+        original_interest = total_interest(principals, monthly_rates, payments, terms.astype(np.int64))
+    new_months, new_interest, valid = _payoff(principals, monthly_rates, payments + extras)
+    valid &= np.isfinite(payments) & np.isfinite(original_interest) & _precise(principals, monthly_rates, terms)
+    return _rows(
+        valid,
+        monthly_payment=payments.round(2),
+        original_months=terms.astype(np.int64),
+        original_interest=original_interest.round(2),
+        new_months=new_months,
+        new_interest=new_interest.round(2),
+        months_saved=terms.astype(np.int64) - new_months,
+        interest_saved=(original_interest - new_interest).round(2),
+    )
+
+
+def _schedule_response(params):
+    # Full schedule through the shared cache, columns as JSON arrays
+    if params.get("monthly_payment") is not None:
+        parsed = _term_params(params)
+    else:
+        parsed = _payment_params(params)
+        parsed["monthly_payment"] = float(solve_payment(parsed["principal"], parsed["annual_rate"], parsed["term_months"]))
+    principal, annual_rate = parsed["principal"], parsed["annual_rate"]
+    monthly_payment, extra_payment = parsed["monthly_payment"], parsed["extra_payment"]
+    # Same limits as the batched endpoints, before any schedule is built
+    _, _, valid = _payoff(np.array([principal]), np.array([annual_rate / 100 / 12]),
+                          np.array([monthly_payment + extra_payment]))
+    if not valid[0]:
+        raise RequestError("These inputs cannot be priced to the cent within the service's limits.")
+    try:
+        start_date = date.fromisoformat(params["start_date"]) if params.get("start_date") else None
+    except (TypeError, ValueError):
+        raise RequestError("Field 'start_date' must be an ISO date (YYYY-MM-DD).") from None
+
+    schedule, months, interest = cached_amortization_schedule(
+        principal, annual_rate, monthly_payment, extra_payment, start_date
+    )
+    columns = {name: schedule[name].to_numpy().tolist() for name in schedule.columns if name != "Date"}
+    columns["Date"] = np.datetime_as_string(schedule["Date"].to_numpy(), unit="D").tolist()
+    return {
+        "monthly_payment": round(monthly_payment, 2),
+        "months": months,
+        "total_interest": round(interest, 2),
+        "schedule": columns,
+    }
+
+
+def create_app(max_batch=256, max_delay=0.002):
+    # The ASGI application. Endpoints (JSON in, JSON out):
+    #   POST /payment         principal, annual_rate, term_months[, extra_payment]
+    #   POST /term            principal, annual_rate, monthly_payment[, extra_payment]
+    #   POST /interest-saved  principal, annual_rate, term_months, extra_payment
+    #   POST /schedule        principal, annual_rate, term_months or monthly_payment[, extra_payment, start_date]
+    #   GET  /healthz, GET /metrics (Prometheus text)
+    routes = {
+        "/payment": (_payment_params, MicroBatcher("payment", _price_payments, max_batch, max_delay)),
+        "/term": (_term_params, MicroBatcher("term", _price_terms, max_batch, max_delay)),
+        "/interest-saved": (_payment_params, MicroBatcher("interest_saved", _price_interest_saved, max_batch, max_delay)),
+    }
+
+    def metrics():
+        lines = [
+            "# HELP loancore_service_requests_total Requests priced per endpoint.",
+            "# TYPE loancore_service_requests_total counter",
+        ]
+        lines += [f'loancore_service_requests_total{{endpoint="{b.name}"}} {b.requests}' for _, b in routes.values()]
+        lines += [
+            "# HELP loancore_service_batches_total Vectorized engine calls per endpoint.",
+            "# TYPE loancore_service_batches_total counter",
+        ]
+        lines += [f'loancore_service_batches_total{{endpoint="{b.name}"}} {b.batches}' for _, b in routes.values()]
+        return "\n".join(lines) + "\n" + telemetry.prometheus_text()
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    for _, batcher in routes.values():
+                        batcher.close()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        path = scope["path"].rstrip("/") or "/"
+        method = scope["method"]
+        if method == "GET" and path == "/healthz":
+            return await _respond(send, 200, {"status": "ok"})
+        if method == "GET" and path == "/metrics":
+            return await _respond(send, 200, metrics(), "text/plain; version=0.0.4")
+        if path not in routes and path != "/schedule":
+            return await _respond(send, 404, {"error": f"Unknown endpoint {path}."})
+        if method != "POST":
+            return await _respond(send, 405, {"error": "Use POST with a JSON body."})
+
+        try:
+            params = json.loads(await _read_body(receive) or b"{}")
+            if not isinstance(params, dict):
+                raise RequestError("The request body must be a JSON object.")
+            if path == "/schedule":
+                result = await asyncio.to_thread(_schedule_response, params)
+            else:
+                validate, batcher = routes[path]
+                result = await batcher.submit(validate(params))
+        except json.JSONDecodeError:
+            return await _respond(send, 400, {"error": "The request body must be valid JSON."})
+        except RequestError as e:
+            return await _respond(send, 400, {"error": str(e)})
+        except Exception:
+            return await _respond(send, 500, {"error": "The request could not be priced."})
+        return await _respond(send, 422 if "error" in result else 200, result)
+
+    app.batchers = {batcher.name: batcher for _, batcher in routes.values()}
+    return app
+
+
+async def _read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def _respond(send, status, payload, content_type="application/json"):
+    body = payload.encode("utf-8") if isinstance(payload, str) else json.dumps(payload, allow_nan=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loancore.service", description="Run the loan pricing service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=256, help="most requests per engine call")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0, help="how long a batch waits for more requests")
+    args = parser.parse_args(argv)
+
+    # uvicorn is optional and only needed to serve
+    try:
+        import uvicorn
+    except ImportError as e:
+        raise ImportError("The pricing service requires uvicorn: pip install uvicorn") from e
+
+    app = create_app(args.max_batch, args.max_delay_ms / 1000)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", lifespan="on")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
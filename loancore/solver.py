@@ -0,0 +1,118 @@
+import numpy as np
+
+# Closed-form loan math: payment, term and rate solvers for fixed-payment loans.
+# Everything works on scalars and on broadcastable NumPy arrays of loans.
+# Rates passed to the solve_* functions are annual percentages, like the UI;
+# the lower-level helpers take the monthly rate as a fraction.
+
+
+def remaining_balance(principal, monthly_rate, payment, periods):
+    # Closed-form balance after the given numbers of fixed payments
+    growth = (1 + monthly_rate) ** periods
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(monthly_rate > 0, (growth - 1) / monthly_rate, periods)
+    return principal * growth - payment * annuity
+
+
+def payoff_periods(principal, monthly_rate, payment):
+    # Number of payments needed to retire the loan:
+    # n = -log(1 - rP/A) / log(1 + r), rounded up to whole months
+    principal, monthly_rate, payment = np.broadcast_arrays(
+        np.asarray(principal, dtype=float), np.asarray(monthly_rate, dtype=float), np.asarray(payment, dtype=float)
+    )
+    active = principal > 0
+    if np.any(active & (payment <= principal * monthly_rate)):
+        raise ValueError("Monthly payment must be greater than the monthly interest.")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        periods = np.where(
+            monthly_rate > 0,
+            -np.log1p(-monthly_rate * principal / payment) / np.log1p(monthly_rate),
+            principal / payment
+        )
+    # Absorb floating point noise when the payment retires the loan exactly
+    months = np.maximum(np.ceil(np.where(active, periods, 0) - 1e-9), 1).astype(np.int64)
+    months = np.where(active, months, 0)
+    return int(months) if months.ndim == 0 else months
+
+
+def total_interest(principal, monthly_rate, payment, months=None):
+    # Interest over the life of the loan: everything paid minus the principal.
+    # The final payment is whatever is left after months - 1 full payments.
+    if months is None:
+        months = payoff_periods(principal, monthly_rate, payment)
+    full_payments = np.maximum(np.asarray(months) - 1, 0)
+    last_opening = remaining_balance(principal, monthly_rate, payment, full_payments)
+    paid = full_payments * payment + last_opening * (1 + monthly_rate)
+    interest = np.where(np.asarray(months) > 0, paid - principal, 0.0)
+    return float(interest) if interest.ndim == 0 else interest
+
+
+def solve_payment(principal, annual_rate, months):
+    # Level monthly payment that retires the loan in the given number of months
+    monthly_rate = np.asarray(annual_rate, dtype=float) / 100 / 12
+    months = np.asarray(months, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(
+            monthly_rate > 0,
+            principal * monthly_rate / -np.expm1(-months * np.log1p(monthly_rate)),
+            principal / months
+        )
+    return float(payment) if payment.ndim == 0 else payment
+
+
+def solve_term(principal, annual_rate, payment):
+    # Months to payoff and total interest, in O(1) per loan
+    monthly_rate = np.asarray(annual_rate, dtype=float) / 100 / 12
+    months = payoff_periods(principal, monthly_rate, payment)
+    return months, total_interest(principal, monthly_rate, payment, months)
+
+
+def solve_rate(principal, payment, months, tol=1e-12, max_iter=60):
+    # Annual rate (%) at which the payment retires the loan in the given
+    # number of months. Safeguarded Newton iteration, vectorized over loans:
+    # the monthly rate is bracketed by [A/P - 1/n, A/P] and a step that leaves
+    # the bracket falls back to bisection.
+    principal, payment, months = np.broadcast_arrays(
+        np.asarray(principal, dtype=float), np.asarray(payment, dtype=float), np.asarray(months, dtype=float)
+    )
+    if np.any(payment * months < principal * (1 - 1e-12)):
+        raise ValueError("Payments do not cover the principal at any non-negative rate.")
+
+    hi = payment / principal
+    lo = np.maximum(hi - 1 / months, 0.0)
+    rate = (lo + hi) / 2
+
+    for _ in range(max_iter):
+        value, slope = _payment_and_slope(principal, rate, months)
+        error = value - payment
+        lo = np.where(error < 0, rate, lo)
+        hi = np.where(error > 0, rate, hi)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = rate - error / slope
+        outside = ~((step > lo) & (step < hi))
+        new_rate = np.where(outside, (lo + hi) / 2, step)
+        done = np.abs(new_rate - rate) <= tol
+        rate = new_rate
+        if np.all(done):
+            break
+
+    # Payments that exactly cover the principal mean an interest-free loan
+    rate = np.where(payment * months <= principal * (1 + 1e-12), 0.0, rate)
+    annual = rate * 12 * 100
+    return float(annual) if annual.ndim == 0 else annual
+
+
+def _payment_and_slope(principal, monthly_rate, months):
+    # Annuity payment for a monthly rate and its derivative with respect to the
+    # rate, using the r -> 0 limits where the closed form is 0/0
+    small = monthly_rate < 1e-10
+    rate = np.where(small, 1.0, monthly_rate)
+    discount = np.exp(-months * np.log1p(rate))
+    denominator = 1 - discount
+    value = principal * rate / denominator
+    slope = principal * (denominator - rate * months * discount / (1 + rate)) / denominator ** 2
+    value = np.where(small, principal / months, value)
+    slope = np.where(small, principal * (months + 1) / (2 * months), slope)
+    return value, slope
@@ -0,0 +1,51 @@
+import numpy as np
+
+from .solver import payoff_periods, solve_payment, total_interest
+
+# Sensitivity sweeps. Each extra-payment amount is just another payment level
+# for the closed-form term and interest formulas, so a whole curve or grid is
+# a single broadcast NumPy evaluation instead of one schedule per value.
+
+
+def extra_payment_sweep(principal, annual_rate, monthly_payment, extra_payments):
+    # Months and interest to payoff for every extra payment amount, with the
+    # savings against no extra payment
+    import pandas as pd
+
+    extras = np.asarray(extra_payments, dtype=float)
+    monthly_rate = annual_rate / 100 / 12
+    payments = monthly_payment + np.concatenate(([0.0], extras))
+
+    months = payoff_periods(principal, monthly_rate, payments)
+    interest = total_interest(principal, monthly_rate, payments, months)
+
+    return pd.DataFrame({
+        "Extra Payment": extras,
+        "Months": months[1:],
+        "Total Interest": interest[1:],
+        "Months Saved": months[0] - months[1:],
+        "Interest Saved": interest[0] - interest[1:],
+    })
+
+
+def extra_payment_rate_grid(principal, annual_rates, extra_payments, term_months):
+    # Savings over a rates x extra payments grid. For each rate the regular
+    # payment is the one that retires the loan in term_months; the extra
+    # payment comes on top of it.
+    rates = np.asarray(annual_rates, dtype=float)[:, None]
+    extras = np.asarray(extra_payments, dtype=float)[None, :]
+    monthly_rates = rates / 100 / 12
+    regular = solve_payment(principal, rates, term_months)
+
+    months = payoff_periods(principal, monthly_rates, regular + extras)
+    interest = total_interest(principal, monthly_rates, regular + extras, months)
+    base_interest = total_interest(principal, monthly_rates, regular, term_months)
+
+    return {
+        "annual_rates": rates[:, 0],
+        "extra_payments": extras[0],
+        "months": months,
+        "total_interest": interest,
+        "months_saved": term_months - months,
+        "interest_saved": base_interest - interest,
+    }
@@ -0,0 +1,154 @@
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+import json
+import logging
+import os
+import threading
+import time
+
+# Lightweight timing spans. Stages of a rerun are wrapped in span(name); each
+# finished span is added to the current rerun's breakdown (only between
+# start_rerun and finish_rerun, and at most MAX_RERUN_SPANS), to process-wide
+# Prometheus-style counters and, as one JSON line, to the "loancore.timing"
+# logger. Timing is off unless LOANCORE_TIMING is set (or enable() is called);
+# while off, span() hands back a shared no-op context manager, so the spans
+# can stay in place in production.
+
+logger = logging.getLogger("loancore.timing")
+
+_enabled = os.environ.get("LOANCORE_TIMING", "").lower() in ("1", "true", "yes", "on")
+_NOOP = nullcontext()
+
+# Spans kept per rerun breakdown; the oldest are dropped beyond this
+MAX_RERUN_SPANS = 1000
+
+# Per-thread state: Streamlit runs each session's reruns on its own thread
+_local = threading.local()
+
+_lock = threading.Lock()
+_counters = defaultdict(lambda: [0, 0.0])  # span name -> [calls, seconds]
+
+
+def enabled():
+    return _enabled
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = bool(flag)
+    if _enabled and not logger.handlers and not logging.getLogger().handlers:
+        # Nothing configured logging: still emit the JSON lines on stderr
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+
+def span(name):
+    # Context manager timing one stage; a shared no-op while timing is off
+    if not _enabled:
+        return _NOOP
+    return _timed(name)
+
+
+@contextmanager
+def _timed(name):
+    stack = _stack()
+    stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+        _record(name, seconds, len(stack))
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+        _local.spans = deque(maxlen=MAX_RERUN_SPANS)
+        _local.rerun = 0
+    return _local.stack
+
+
+def _record(name, seconds, depth):
+    with _lock:
+        counter = _counters[name]
+        counter[0] += 1
+        counter[1] += seconds
+    if hasattr(_local, "rerun_start"):
+        # Threads that never start a rerun (the service's) keep no breakdown
+        _local.spans.append({"span": name, "ms": seconds * 1e3, "depth": depth})
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({"event": "span", "span": name, "ms": round(seconds * 1e3, 3), "depth": depth,
+                                "rerun": _local.rerun, "thread": threading.current_thread().name}))
+
+
+def start_rerun():
+    # Begin a new breakdown for this thread; call at the top of the script
+    if not _enabled:
+        return
+    _stack().clear()
+    _local.spans.clear()
+    _local.rerun += 1
+    _local.rerun_start = time.perf_counter()
+
+
+def finish_rerun():
+    # Close the breakdown: records the whole rerun as the "rerun" span and
+    # returns the breakdown, or None while timing is off
+    if not _enabled or not hasattr(_local, "rerun_start"):
+        return None
+    _record("rerun", time.perf_counter() - _local.rerun_start, 0)
+    del _local.rerun_start
+    return last_rerun()
+
+
+def last_rerun():
+    # Spans finished on this thread since start_rerun, in completion order
+    return list(getattr(_local, "spans", []))
+
+
+def counters():
+    with _lock:
+        return {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in _counters.items()}
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+
+
+def prometheus_text():
+    # Counters in the Prometheus text exposition format, with the cache stats
+    from .cache import get_caches
+
+    lines = [
+        "# HELP loancore_span_seconds_total Time spent in each instrumented stage.",
+        "# TYPE loancore_span_seconds_total counter",
+    ]
+    snapshot = counters()
+    for name, counter in sorted(snapshot.items()):
+        lines.append(f'loancore_span_seconds_total{{span="{name}"}} {counter["seconds"]:.6f}')
+    lines += [
+        "# HELP loancore_span_calls_total Number of times each instrumented stage ran.",
+        "# TYPE loancore_span_calls_total counter",
+    ]
+    for name, counter in sorted(snapshot.items()):
+        lines.append(f'loancore_span_calls_total{{span="{name}"}} {counter["calls"]}')
+
+    caches = get_caches()
+    for metric, field, kind in (("hits_total", "hits", "counter"), ("misses_total", "misses", "counter"),
+                                ("entries", "size", "gauge")):
+        lines += [
+            f"# HELP loancore_cache_{metric} Cache {field} per cache.",
+            f"# TYPE loancore_cache_{metric} {kind}",
+        ]
+        for cache_name, cache in sorted(caches.items()):
+            lines.append(f'loancore_cache_{metric}{{cache="{cache_name}"}} {cache.stats()[field]}')
+    return "\n".join(lines) + "\n"
+
+
+if _enabled:
+    enable()
@@ -0,0 +1,86 @@
+from functools import lru_cache
+
+# Chart styling shared by every figure. The fonts, title, axis, legend and
+# background settings live in one Plotly template registered as "loancore";
+# figures only name it and carry their own data, titles and colors. Render
+# them with st.plotly_chart(..., theme=None): Streamlit's own chart theme
+# rewrites the template layout in the browser.
+
+TEMPLATE = "loancore"
+
+FONT_FAMILY = "Poppins, sans-serif"
+TITLE_COLOR = "#1e3a8a"
+TEXT_COLOR = "#64748b"
+GRID_COLOR = "rgba(220, 220, 220, 0.4)"
+TRANSPARENT = "rgba(0,0,0,0)"
+
+# Named colors used across charts
+COLORS = {
+    "blue": "#3b82f6",
+    "red": "#ef4444",
+    "green": "#10b981",
+    "orange": "#f97316",
+    "purple": "#8b5cf6",
+    "rose": "#f43f5e",
+    "cyan": "#06b6d4",
+    "violet": "#a855f7",
+}
+
+# Balance and interest colors per loan type
+LOAN_COLORS = {
+    "mortgage": {"balance": COLORS["blue"], "interest": COLORS["red"]},
+    "car": {"balance": COLORS["green"], "interest": COLORS["orange"]},
+    "auto": {"balance": COLORS["green"], "interest": COLORS["orange"]},
+    "personal": {"balance": COLORS["purple"], "interest": COLORS["rose"]},
+    "education": {"balance": COLORS["cyan"], "interest": COLORS["violet"]},
+}
+
+
+def loan_colors(loan_type):
+    return LOAN_COLORS.get(loan_type, LOAN_COLORS["mortgage"])
+
+
+@lru_cache(maxsize=None)
+def rgba(color, alpha):
+    # "#rrggbb" with an opacity as an "rgba(...)" string, parsed once per pair
+    red, green, blue = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+    return f"rgba({red}, {green}, {blue}, {alpha})"
+
+
+def chart_template():
+    # Register the template on first use and return its name for layout.template
+    import plotly.io as pio
+
+    if TEMPLATE not in pio.templates:
+        pio.templates[TEMPLATE] = _build_template()
+    return TEMPLATE
+
+
+def _build_template():
+    import plotly.graph_objects as go
+
+    axis = dict(
+        title=dict(font=dict(size=14, color=TEXT_COLOR)),
+        tickfont=dict(size=12, color=TEXT_COLOR),
+        gridcolor=GRID_COLOR,
+        zeroline=False,
+        automargin=True,
+    )
+    readable_text = dict(size=14, color="black")
+    return go.layout.Template(
+        layout=dict(
+            font=dict(family=FONT_FAMILY, color=TEXT_COLOR),
+            title=dict(font=dict(size=20, color=TITLE_COLOR), x=0.5, xanchor="center"),
+            xaxis=axis,
+            yaxis=axis,
+            legend=dict(font=dict(size=14, color=TEXT_COLOR)),
+            colorway=list(COLORS.values()),
+            hoverlabel=dict(font=dict(family=FONT_FAMILY)),
+            plot_bgcolor=TRANSPARENT,
+            paper_bgcolor=TRANSPARENT,
+        ),
+        data=dict(
+            bar=[go.Bar(textfont=readable_text, cliponaxis=False)],
+            pie=[go.Pie(textfont=readable_text)],
+        ),
+    )
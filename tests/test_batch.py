@@ -0,0 +1,102 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from loancore import price_loans, price_tape, read_tape, solve_payment
+from loancore.batch import main
+
+START_DATE = date(2024, 1, 31)
+
+# Tape columns under the lender's own names, mapped with rename / --column
+RENAME = {"id": "loan_id", "balance": "principal", "rate": "annual_rate"}
+
+
+def tape():
+    return pd.DataFrame({
+        "id": np.arange(100, 110),
+        "balance": [250000, 18000, 500000, -5, 300000, 42000, 0, 120000, 75000, 900000],
+        "rate": [5.5, 7.9, 6.25, 5.0, 12.0, 0.0, 4.0, np.nan, 3.5, 6.875],
+        "term_months": [360, 60, np.nan, 360, np.nan, 48, 120, 180, 120, 360],
+        "monthly_payment": [np.nan, np.nan, 3200, np.nan, 2500, np.nan, np.nan, np.nan, np.nan, np.nan],
+        "extra_payment": [0, 50, np.nan, 0, 0, 100, 0, 0, 250, 0],
+        "branch": ["a"] * 10,
+    })
+
+
+def test_price_loans_status_and_solved_payment():
+    frame = tape().rename(columns=RENAME).drop(columns="branch")
+    summary, priced = price_loans(frame, START_DATE)
+
+    assert summary["loan_id"].tolist() == list(range(100, 110))
+    assert summary["Status"].tolist() == [
+        "ok", "ok", "ok", "invalid input", "payment does not cover interest", "ok", "ok", "invalid input", "ok", "ok",
+    ]
+    # A missing payment is solved from term_months
+    assert summary["Monthly Payment"][0] == round(solve_payment(250000, 5.5, 360), 2)
+    assert summary["Months"][0] == 360
+    assert summary["Months"][6] == 0
+    assert summary["Total Interest"][5] == 0
+    assert np.isnan(summary["Total Interest"][4])
+    assert pd.isna(summary["Payoff Date"][3])
+    assert priced["loan_ids"].tolist() == [100, 101, 102, 105, 106, 108, 109]
+
+
+def write_tapes(tmp_path):
+    # The same tape as CSV, Parquet and Arrow IPC file and stream, the Arrow
+    # ones in record batches of 3 rows so that reading re-slices them
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    frame = tape()
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    paths = {name: str(tmp_path / f"tape.{name}") for name in ("csv", "parquet", "arrow", "ipc")}
+    frame.to_csv(paths["csv"], index=False)
+    pq.write_table(table, paths["parquet"], row_group_size=3)
+    with pa.ipc.new_file(paths["arrow"], table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=3):
+            writer.write_batch(batch)
+    with pa.OSFile(paths["ipc"], "wb") as sink, pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=3):
+            writer.write_batch(batch)
+    return paths
+
+
+def test_read_tape_chunks(tmp_path):
+    for path in write_tapes(tmp_path).values():
+        frames = list(read_tape(path, chunk_rows=4, rename=RENAME))
+        assert [len(frame) for frame in frames] == [4, 4, 2]
+        combined = pd.concat(frames, ignore_index=True)
+        assert "branch" not in combined
+        assert combined["loan_id"].tolist() == list(range(100, 110))
+        np.testing.assert_array_equal(combined["principal"], tape()["balance"])
+
+
+def test_tape_formats_give_identical_summaries(tmp_path):
+    summaries = {}
+    for name, path in write_tapes(tmp_path).items():
+        target = str(tmp_path / f"summary-{name}.csv")
+        loans = price_tape(path, target, start_date=START_DATE, chunk_rows=4, workers=1, rename=RENAME)
+        assert loans == 10
+        summaries[name] = pd.read_csv(target)
+
+    expected, _ = price_loans(tape().rename(columns=RENAME), START_DATE)
+    assert summaries["csv"]["Status"].tolist() == expected["Status"].tolist()
+    for name, summary in summaries.items():
+        pd.testing.assert_frame_equal(summary, summaries["csv"], obj=name)
+
+
+def test_command_line_column_mapping(tmp_path):
+    paths = write_tapes(tmp_path)
+    target = str(tmp_path / "summary.csv")
+    argv = [paths["parquet"], "--summary", target, "--start-date", "2024-01-31", "--chunk-rows", "4", "--workers", "1"]
+    argv += [arg for source, column in RENAME.items() for arg in ("--column", f"{source}={column}")]
+    assert main(argv) == 0
+
+    expected = str(tmp_path / "expected.csv")
+    price_tape(paths["csv"], expected, start_date=START_DATE, workers=1, rename=RENAME)
+    pd.testing.assert_frame_equal(pd.read_csv(target), pd.read_csv(expected))
+
+    with pytest.raises(SystemExit):
+        main([paths["csv"], "--summary", target, "--column", "balance=balance"])
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from loancore import amortize_cents, calculate_amortization_schedule_cents, contractual_terms, solve_payment, to_cents
+
+
+def test_last_scheduled_payment_clears_the_balance():
+    # 1,798.65 is rounded down from the level payment; the few dollars left
+    # are collected with payment 360, not in a 361st
+    payment = round(solve_payment(300000, 6.0, 360), 2)
+    df, months, _ = calculate_amortization_schedule_cents(300000, 6.0, payment)
+    assert months == 360
+    assert df["Remaining Balance"].iloc[-1] == 0
+    assert df["Total Payment"].iloc[-1] == pytest.approx(1800.09)
+    assert (df["Total Payment"].iloc[:-1] == payment).all()
+
+    _, months, _ = calculate_amortization_schedule_cents(300000, 6.0, payment, term_months=0)
+    assert months == 361
+
+
+def test_quoted_payments_end_on_their_term():
+    rng = np.random.default_rng(1)
+    principals = rng.uniform(5e4, 1e6, 2000).round(2)
+    rates = rng.uniform(1, 10, 2000).round(3)
+    terms = rng.choice([60, 120, 180, 240, 360], 2000)
+    payments = to_cents(solve_payment(principals, rates, terms)) / 100
+
+    assert (contractual_terms(principals, rates, payments) == terms).all()
+    result = amortize_cents(principals, rates, payments)
+    assert (result["months"] == terms).all()
+    assert (result["principal"].sum(axis=1) == to_cents(principals)).all()
+
+
+def test_rows_reconcile_to_the_cent():
+    result = amortize_cents([250000, 40000], [4.5, 11.0], [1500, 900], [0, 50])
+    assert (result["payment"] == result["interest"] + result["principal"]).all()
+    assert (result["principal"].sum(axis=1) == to_cents([250000, 40000])).all()
+    assert (result["interest"].sum(axis=1) == result["total_interest"]).all()
+    assert (result["balance"][np.arange(2), result["months"] - 1] == 0).all()
+
+
+def test_payment_without_a_term_pays_off_naturally():
+    assert contractual_terms(300000, 6.0, 2000) == 0
+    _, months, _ = calculate_amortization_schedule_cents(300000, 6.0, 2000)
+    assert months == 278
+
+
+@pytest.mark.parametrize("rounding", ["half_even", "half_up"])
+def test_rounding_modes(rounding):
+    assert to_cents([0.125, 0.135], rounding).tolist() == ([12, 14] if rounding == "half_even" else [13, 14])
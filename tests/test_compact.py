@@ -0,0 +1,50 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from loancore import cached_amortization_schedule, calculate_amortization_schedule, compact_schedule, solve_payment
+
+START_DATE = date(2024, 1, 31)
+
+
+@pytest.mark.parametrize("principal,annual_rate,term,extra_payment", [
+    (300000, 6.0, 360, 0),
+    (300000, 6.0, 360, 250),
+    (12000, 0.0, 48, 0),
+    (850000, 9.875, 480, 1000),
+])
+def test_cents_rows_reconcile(principal, annual_rate, term, extra_payment):
+    payment = solve_payment(principal, annual_rate, term)
+    columns = compact_schedule(
+        principal, annual_rate, payment, extra_payment, START_DATE, money_dtype="cents"
+    ).columns
+    assert (columns["payment"] == columns["interest"] + columns["principal"]).all()
+    assert columns["principal"].sum() == principal * 100
+    assert columns["balance"][-1] == 0
+    # Rounding moves a payment by a cent at most
+    assert np.abs(columns["payment"][:-1] - round((payment + extra_payment) * 100)).max() <= 1
+
+
+@pytest.mark.parametrize("money_dtype", ["float64", "float32", "cents"])
+def test_total_interest_is_the_same_for_slices(money_dtype):
+    payment = solve_payment(300000, 6.0, 360)
+    schedule = compact_schedule(300000, 6.0, payment, 0, START_DATE, money_dtype=money_dtype)
+    assert schedule.total_interest == 347514.56
+    assert schedule[:].total_interest == schedule.total_interest
+    assert schedule[:100].total_interest + schedule[100:].total_interest == pytest.approx(schedule.total_interest)
+    assert schedule.total_interest == pytest.approx(schedule.to_pandas()["Interest"].sum())
+
+
+def test_cached_schedule_matches_calculated():
+    payment = solve_payment(250000, 4.5, 180)
+    df, months, interest = cached_amortization_schedule(250000, 4.5, payment, 100, START_DATE)
+    expected_df, expected_months, expected_interest = calculate_amortization_schedule(
+        250000, 4.5, payment, 100, START_DATE
+    )
+    assert months == expected_months
+    # The sum of the rounded rows: within half a cent a row of the exact sum
+    assert interest == pytest.approx(df["Interest"].sum())
+    assert interest == pytest.approx(expected_interest, abs=0.005 * months)
+    for column in ("Total Payment", "Interest", "Principal", "Remaining Balance"):
+        np.testing.assert_allclose(df[column].to_numpy(), expected_df[column].to_numpy(), rtol=0, atol=1e-9)
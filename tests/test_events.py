@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from loancore import IncrementalSchedule, PrepaymentEvents, solve_payment
+from loancore.events import prepayment_summary
+from loancore.schedule import amortize_events
+
+
+def reference(principal, annual_rate, monthly_payment, events, extra_payment=0.0):
+    # Month-by-month loop: payments, total interest and months under the events
+    monthly_rate = annual_rate / 100 / 12
+    payment = monthly_payment + extra_payment + events.monthly_extra(monthly_payment)
+    balance, period, interest, payments = float(principal), 0, 0.0, []
+    while balance > 1e-6:
+        period_interest = balance * monthly_rate
+        paid = 0.0 if events.skipped(period) else min(payment + events.adjustment(period), balance + period_interest)
+        balance = balance + period_interest - paid
+        interest += period_interest
+        payments.append(paid)
+        period += 1
+    return np.array(payments), interest, period
+
+
+def check(principal, annual_rate, monthly_payment, events, extra_payment=0.0):
+    payments, interest, months = reference(principal, annual_rate, monthly_payment, events, extra_payment)
+
+    arrays = amortize_events(principal, annual_rate, monthly_payment, events, extra_payment)
+    assert arrays["months"] == months
+    assert arrays["interest"].sum() == pytest.approx(interest, abs=0.01)
+    np.testing.assert_allclose(arrays["payment"], payments, rtol=0, atol=0.01)
+
+    assert prepayment_summary(principal, annual_rate, monthly_payment, events, extra_payment) == (
+        months, pytest.approx(interest, abs=0.01)
+    )
+
+    scenario = IncrementalSchedule(principal, annual_rate, monthly_payment).scenario(extra_payment, events=events)
+    assert scenario["months"] == months
+    assert scenario["total_interest"] == pytest.approx(interest, abs=0.01)
+
+
+@pytest.mark.parametrize("events,extra_payment", [
+    (PrepaymentEvents({12: 10000, 60: 5000, 120: 25000}), 0.0),
+    (PrepaymentEvents(skipped_payments=[5, 6, 200]), 100.0),
+    (PrepaymentEvents(annual_extra=2500, annual_month=3), 0.0),
+    (PrepaymentEvents(biweekly=True), 0.0),
+    (PrepaymentEvents({1: 500000}), 0.0),
+    (PrepaymentEvents({24: 1000}, skipped_payments=[24], annual_extra=100, biweekly=True), 50.0),
+])
+def test_events_match_monthly_loop(events, extra_payment):
+    check(400000, 6.5, solve_payment(400000, 6.5, 360), events, extra_payment)
+
+
+def test_recurring_events_continue_past_the_original_payoff():
+    # Skipping two years of payments makes a ten-year loan run about 13 years;
+    # the annual extra keeps coming every year until the end
+    monthly_payment = solve_payment(100000, 6.0, 120)
+    events = PrepaymentEvents(skipped_payments=range(1, 25), annual_extra=100)
+    check(100000, 6.0, monthly_payment, events, 50.0)
+
+    arrays = amortize_events(100000, 6.0, monthly_payment, events, 50.0)
+    assert arrays["months"] > 144
+    # Every twelfth payment after the skipped ones carries the extra
+    annual = np.arange(35, arrays["months"] - 1, 12)
+    assert (arrays["payment"][annual] > monthly_payment + 50.0 + 99.99).all()
+
+
+def test_skipped_payment_pays_nothing():
+    monthly_payment = solve_payment(200000, 5.0, 360)
+    events = PrepaymentEvents(skipped_payments=[3, 4], biweekly=True)
+    arrays = amortize_events(200000, 5.0, monthly_payment, events, extra_payment=200.0)
+    assert arrays["payment"][2] == 0.0
+    assert arrays["payment"][3] == 0.0
+    assert arrays["balance"][3] > arrays["balance"][1]
+
+
+def test_random_events_match_monthly_loop():
+    rng = np.random.default_rng(3)
+    for _ in range(40):
+        principal = float(rng.uniform(5e4, 8e5))
+        annual_rate = float(rng.uniform(0, 9))
+        term = int(rng.choice([60, 120, 360]))
+        events = PrepaymentEvents(
+            {int(p): float(rng.uniform(100, 20000)) for p in rng.integers(1, term + 40, rng.integers(0, 4))},
+            skipped_payments=sorted(set(rng.integers(1, term, rng.integers(0, 6)).tolist())),
+            annual_extra=float(rng.choice([0, 100, 2000])),
+            annual_month=int(rng.integers(1, 13)),
+            biweekly=bool(rng.random() < 0.3),
+        )
+        check(principal, annual_rate, solve_payment(principal, annual_rate, term), events, float(rng.choice([0, 50])))
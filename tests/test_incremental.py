@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from loancore import IncrementalSchedule, cached_incremental_schedule, get_caches, solve_payment
+from loancore.schedule import amortize_arrays, amortize_segments
+
+PRINCIPAL, RATE = 350000, 6.5
+PAYMENT = solve_payment(PRINCIPAL, RATE, 360)
+
+
+def full(extra_payment=0.0, lump_sums=None, rate_changes=None):
+    # The same scenario evaluated from the first payment, nothing reused
+    return amortize_segments(
+        PRINCIPAL, RATE, PAYMENT, extra_payment,
+        rate_changes={k - 1: v for k, v in (rate_changes or {}).items()},
+        lump_sums={k - 1: v for k, v in (lump_sums or {}).items()},
+    )
+
+
+@pytest.mark.parametrize("extra_payment,lump_sums,rate_changes", [
+    (0.0, None, None),
+    (250.0, None, None),
+    (0.0, {1: 20000}, None),
+    (100.0, {36: 15000, 120: 40000}, None),
+    (0.0, None, {61: 7.5}),
+    (300.0, {24: 10000}, {61: 5.0, 121: 8.25}),
+    (0.0, {500: 1000}, None),
+])
+def test_scenario_matches_full_recomputation(extra_payment, lump_sums, rate_changes):
+    engine = IncrementalSchedule(PRINCIPAL, RATE, PAYMENT)
+    arrays = engine.scenario(extra_payment, lump_sums, rate_changes)
+    expected = full(extra_payment, lump_sums, rate_changes)
+    assert arrays["months"] == expected["months"]
+    assert arrays["total_interest"] == pytest.approx(expected["interest"].sum(), abs=0.01)
+    for name in ("payment", "interest", "principal", "balance"):
+        np.testing.assert_allclose(arrays[name], expected[name], rtol=0, atol=1e-6)
+
+
+def test_compare_against_baseline():
+    engine = IncrementalSchedule(PRINCIPAL, RATE, PAYMENT)
+    baseline = amortize_arrays(PRINCIPAL, RATE, PAYMENT)
+    accelerated = amortize_arrays(PRINCIPAL, RATE, PAYMENT, 200.0)
+    savings = engine.compare(200.0)
+    assert savings["original_months"] == baseline["months"]
+    assert savings["months_saved"] == baseline["months"] - accelerated["months"]
+    assert savings["interest_saved"] == pytest.approx(baseline["interest"].sum() - accelerated["interest"].sum())
+
+
+def test_paths_are_evicted_beyond_max_paths():
+    engine = IncrementalSchedule(PRINCIPAL, RATE, PAYMENT, max_paths=2)
+    for extra_payment in (100.0, 200.0, 300.0):
+        engine.path(extra_payment)
+    assert list(engine._paths) == [200.0, 300.0]
+
+
+def test_engines_have_their_own_cache():
+    caches = get_caches()
+    before = caches["schedule"].stats()["size"]
+    engine = cached_incremental_schedule(PRINCIPAL, RATE, PAYMENT)
+    assert cached_incremental_schedule(PRINCIPAL, RATE, PAYMENT) is engine
+    assert caches["incremental"].stats()["size"] >= 1
+    assert caches["incremental"].stats()["maxsize"] * engine.max_paths <= 2 * caches["schedule"].maxsize
+    assert caches["schedule"].stats()["size"] == before
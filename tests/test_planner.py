@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from loancore import optimize_payoff_order, payoff_balances, plan_payoff
+
+
+def reference(balances, annual_rates, minimum_payments, budget, order):
+    # Month-by-month loop with the planner's rules: every debt gets its
+    # minimum, the focus debt the rest of the budget, and money left over from
+    # a final payment goes to the next debts in the order that same month
+    balance = np.array(balances, dtype=float)
+    monthly_rates = np.array(annual_rates, dtype=float) / 1200
+    paid = np.zeros(len(balance))
+    payoff_month = np.zeros(len(balance), dtype=int)
+    history = [balance.copy()]
+    month = 0
+    while (balance > 1e-9).any():
+        month += 1
+        active = balance > 1e-9
+        payments = np.where(active, minimum_payments, 0.0)
+        payments[next(i for i in order if active[i])] += budget - payments.sum()
+        balance = balance * (1 + monthly_rates)
+        pool = 0.0
+        for i in np.flatnonzero(active):
+            amount = min(payments[i], balance[i])
+            balance[i] -= amount
+            paid[i] += amount
+            pool += payments[i] - amount
+        for i in order:
+            if pool > 1e-9 and balance[i] > 1e-9:
+                amount = min(pool, balance[i])
+                balance[i] -= amount
+                paid[i] += amount
+                pool -= amount
+        cleared = active & (balance <= 1e-9)
+        balance[cleared] = 0.0
+        payoff_month[cleared] = month
+        history.append(balance.copy())
+    return paid - np.array(balances), payoff_month, np.array(history)
+
+
+def random_debts(rng, n):
+    balances = rng.uniform(500, 40000, n).round(2)
+    annual_rates = rng.uniform(0, 28, n).round(2)
+    annual_rates[rng.random(n) < 0.1] = 0
+    minimum_payments = np.maximum(balances * rng.uniform(0.01, 0.04, n), 25).round(2)
+    return balances, annual_rates, minimum_payments, minimum_payments.sum() + rng.uniform(0, 1500)
+
+
+@pytest.mark.parametrize("strategy", ["avalanche", "snowball"])
+def test_plan_matches_monthly_loop(strategy):
+    rng = np.random.default_rng(3)
+    for _ in range(60):
+        balances, annual_rates, minimum_payments, budget = random_debts(rng, int(rng.integers(1, 12)))
+        try:
+            plan = plan_payoff(balances, annual_rates, minimum_payments, budget, strategy)
+        except ValueError:
+            continue
+        interest, payoff_month, history = reference(
+            balances, annual_rates, minimum_payments, budget, list(plan["order"])
+        )
+        assert (plan["payoff_month"] == payoff_month).all()
+        np.testing.assert_allclose(plan["interest"], interest, rtol=0, atol=1e-6)
+        np.testing.assert_allclose(payoff_balances(plan), history, rtol=0, atol=1e-6)
+
+
+def test_strategy_orders():
+    balances, annual_rates, minimum_payments = [5000, 1200, 9000], [19.9, 7.5, 24.0], [100, 35, 180]
+    assert plan_payoff(balances, annual_rates, minimum_payments, 600, "avalanche")["order"].tolist() == [2, 0, 1]
+    assert plan_payoff(balances, annual_rates, minimum_payments, 600, "snowball")["order"].tolist() == [1, 0, 2]
+    plan = plan_payoff(balances, annual_rates, minimum_payments, 600, "custom", [0, 2, 1])
+    assert plan["order"].tolist() == [0, 2, 1]
+    with pytest.raises(ValueError):
+        plan_payoff(balances, annual_rates, minimum_payments, 600, "custom", [0, 0, 1])
+
+
+def test_optimized_order_is_never_worse():
+    rng = np.random.default_rng(11)
+    balances, annual_rates, minimum_payments, budget = random_debts(rng, 12)
+    plan = optimize_payoff_order(balances, annual_rates, minimum_payments, budget)
+    for strategy in ("avalanche", "snowball"):
+        assert plan["total_interest"] <= plan_payoff(
+            balances, annual_rates, minimum_payments, budget, strategy
+        )["total_interest"] + 1e-6
+    interest, _, _ = reference(balances, annual_rates, minimum_payments, budget, list(plan["order"]))
+    assert plan["total_interest"] == pytest.approx(interest.sum(), abs=1e-6)
+
+
+def test_budget_must_cover_minimums():
+    with pytest.raises(ValueError):
+        plan_payoff([1000, 2000], [10, 20], [50, 60], 100)
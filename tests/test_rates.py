@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from loancore import PrepaymentEvents, RateSchedule, arm_rate_schedule, solve_payment
+from loancore.schedule import amortize_events, amortize_rate_schedule
+
+PRINCIPAL, RATE, TERM = 400000, 5.5, 360
+PAYMENT = solve_payment(PRINCIPAL, RATE, TERM)
+
+
+def reference(rate_schedule, extra_payment=0.0, lump_sums=None, events=None):
+    # Month-by-month loop that applies every reset, recasting over the months
+    # left of the term even when the rate does not move
+    resets = dict(rate_schedule.resets(RATE))
+    lump_sums = {k - 1: v for k, v in (lump_sums or {}).items()}
+    if events:
+        extra_payment += events.monthly_extra(PAYMENT)
+    balance, rate, payment, period, payments, interest_paid = float(PRINCIPAL), RATE, PAYMENT, 0, [], []
+    while balance > 1e-6:
+        assert period < 1200, "the payment never covers the interest"
+        if period in resets:
+            rate = resets[period]
+            if rate_schedule.recast:
+                payment = solve_payment(balance, rate, max(TERM - period, 1))
+        interest = balance * rate / 1200
+        if events and events.skipped(period):
+            paid = 0.0
+        else:
+            adjustment = lump_sums.get(period, 0.0) + (events.adjustment(period) if events else 0.0)
+            paid = min(payment + extra_payment + adjustment, balance + interest)
+        balance = balance + interest - paid
+        payments.append(paid)
+        interest_paid.append(interest)
+        period += 1
+    return np.array(payments), np.array(interest_paid)
+
+
+SCHEDULES = {
+    "arm_5_1_flat": arm_rate_schedule(5.5, fixed_months=60),
+    "arm_5_1_rising": arm_rate_schedule([6.0, 7.5, 9.0, 12.0, 4.0], fixed_months=60, margin=0.25),
+    "arm_7_1_floor": arm_rate_schedule([3.0, 1.0, 0.5], fixed_months=84, floor=4.0),
+    "no_recast": RateSchedule({61: 6.5, 121: 7.0}, recast=False),
+    "uncapped": RateSchedule({13: 9.0, 25: 2.0, 37: 2.0}),
+}
+
+
+@pytest.mark.parametrize("name", SCHEDULES)
+@pytest.mark.parametrize("extra_payment,lump_sums,events", [
+    (0.0, None, None),
+    (300.0, None, None),
+    (0.0, {30: 20000, 100: 15000}, None),
+    (0.0, None, PrepaymentEvents(annual_extra=2000, skipped_payments=[62, 63])),
+    (150.0, None, PrepaymentEvents(biweekly=True)),
+])
+def test_rate_schedule_matches_monthly_loop(name, extra_payment, lump_sums, events):
+    rate_schedule = SCHEDULES[name]
+    payments, interest = reference(rate_schedule, extra_payment, lump_sums, events)
+    if events:
+        arrays = amortize_events(PRINCIPAL, RATE, PAYMENT, events, extra_payment, rate_schedule)
+    else:
+        # The engine takes lump sums by 0-based period
+        arrays = amortize_rate_schedule(
+            PRINCIPAL, RATE, PAYMENT, rate_schedule, extra_payment,
+            lump_sums={k - 1: v for k, v in (lump_sums or {}).items()}
+        )
+    assert arrays["months"] == len(payments)
+    np.testing.assert_allclose(arrays["payment"], payments, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(arrays["interest"], interest, rtol=0, atol=1e-6)
+    assert arrays["balance"][-1] == 0
+
+
+def test_periodic_cap():
+    schedule = RateSchedule({61: 10.0, 73: 10.0, 85: 1.0}, periodic_cap=2.0)
+    assert schedule.resets(5.0) == [(60, 7.0), (72, 9.0), (84, 7.0)]
+
+
+def test_lifetime_cap():
+    schedule = RateSchedule({61: 9.0, 73: 12.0, 85: 8.0}, lifetime_cap=5.0)
+    assert schedule.resets(5.0) == [(60, 9.0), (72, 10.0), (84, 8.0)]
+
+
+def test_floor():
+    schedule = RateSchedule({61: 2.0, 73: 0.5}, periodic_cap=2.0, floor=3.5)
+    assert schedule.resets(5.0) == [(60, 3.5), (72, 3.5)]
+
+
+def test_caps_apply_in_order():
+    # Periodic cap first, then the lifetime cap, then the floor
+    schedule = RateSchedule({13: 20.0, 25: 20.0, 37: 0.0}, periodic_cap=3.0, lifetime_cap=4.0, floor=2.0)
+    assert schedule.resets(5.0) == [(12, 8.0), (24, 9.0), (36, 6.0)]
@@ -0,0 +1,72 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from loancore import (
+    calculate_amortization_schedule,
+    calculate_amortization_schedule_reference,
+    payoff_periods,
+    solve_payment,
+    total_interest,
+)
+
+START_DATE = date(2024, 1, 31)
+
+LOANS = [
+    # principal, annual rate (%), term (months), extra payment
+    (300000, 6.0, 360, 0),
+    (300000, 6.0, 360, 250),
+    (250000, 4.5, 180, 0),
+    (25000, 7.25, 60, 100),
+    (12000, 0.0, 48, 0),
+    (12000, 0.0, 48, 75),
+    (850000, 9.875, 480, 1000),
+    (1000, 18.0, 12, 0),
+]
+
+
+@pytest.mark.parametrize("principal,annual_rate,term,extra_payment", LOANS)
+def test_vectorized_schedule_matches_reference(principal, annual_rate, term, extra_payment):
+    payment = round(solve_payment(principal, annual_rate, term), 2)
+    df, months, interest = calculate_amortization_schedule(principal, annual_rate, payment, extra_payment, START_DATE)
+    ref_df, ref_months, ref_interest = calculate_amortization_schedule_reference(
+        principal, annual_rate, payment, extra_payment, START_DATE
+    )
+
+    assert months == ref_months
+    assert interest == pytest.approx(ref_interest, abs=0.01)
+    assert (df["Payment #"].to_numpy() == ref_df["Payment #"].to_numpy()).all()
+    assert list(df["Date"]) == list(ref_df["Date"])
+    for column in ("Total Payment", "Interest", "Principal", "Remaining Balance"):
+        np.testing.assert_allclose(df[column].to_numpy(), ref_df[column].to_numpy(), rtol=0, atol=0.0101)
+
+
+def test_random_loans_match_reference():
+    rng = np.random.default_rng(2024)
+    for _ in range(50):
+        principal = round(float(rng.uniform(1000, 1000000)), 2)
+        annual_rate = round(float(rng.uniform(0, 12)), 3)
+        payment = round(solve_payment(principal, annual_rate, int(rng.choice([60, 120, 180, 240, 360]))), 2)
+        extra_payment = float(rng.choice([0, 50, 500]))
+        df, months, interest = calculate_amortization_schedule(principal, annual_rate, payment, extra_payment, START_DATE)
+        ref_df, ref_months, ref_interest = calculate_amortization_schedule_reference(
+            principal, annual_rate, payment, extra_payment, START_DATE
+        )
+        assert months == ref_months
+        assert interest == pytest.approx(ref_interest, abs=0.01)
+        np.testing.assert_allclose(df["Remaining Balance"].to_numpy(), ref_df["Remaining Balance"].to_numpy(),
+                                   rtol=0, atol=0.0101)
+
+
+@pytest.mark.parametrize("principal,annual_rate,term,extra_payment", LOANS)
+def test_closed_form_summary_matches_schedule(principal, annual_rate, term, extra_payment):
+    payment = round(solve_payment(principal, annual_rate, term), 2) + extra_payment
+    _, months, interest = calculate_amortization_schedule_reference(principal, annual_rate, payment)
+    assert payoff_periods(principal, annual_rate / 100 / 12, payment) == months
+    assert total_interest(principal, annual_rate / 100 / 12, payment) == pytest.approx(interest, abs=0.01)
+
+
+def test_payment_below_interest_is_rejected():
+    with pytest.raises(ValueError):
+        calculate_amortization_schedule(100000, 12.0, 1000)
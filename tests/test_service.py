@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import pytest
+
+from loancore import MicroBatcher, create_app, solve_payment
+
+
+async def call(app, method, path, body=b""):
+    # One request through the ASGI app; returns (status, decoded JSON body)
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode("utf-8")
+    scope = {"type": "http", "method": method, "path": path, "headers": []}
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+def run(*requests, max_delay=0.002):
+    # Send the requests concurrently to a fresh app; returns the responses
+    # and the app, for its batch counters
+    app = create_app(max_delay=max_delay)
+
+    async def main():
+        try:
+            return await asyncio.gather(*(call(app, *request) for request in requests))
+        finally:
+            for batcher in app.batchers.values():
+                batcher.close()
+
+    return asyncio.run(main()), app
+
+
+LOAN = {"principal": 250000, "annual_rate": 5.5, "term_months": 360}
+
+
+def test_payment():
+    [(status, body)], _ = run(("POST", "/payment", LOAN))
+    assert status == 200
+    assert body["monthly_payment"] == round(solve_payment(250000, 5.5, 360), 2)
+    assert body["months"] == 360
+
+
+@pytest.mark.parametrize("body,message", [
+    (b"{not json", "valid JSON"),
+    (b"[1, 2]", "JSON object"),
+    ({"principal": 250000, "annual_rate": 6.0, "monthly_payment": 1250}, "greater than the monthly interest"),
+    ({"principal": 250000, "annual_rate": 6.0, "monthly_payment": 1000}, "greater than the monthly interest"),
+    ({"principal": "lots", "annual_rate": 6.0, "monthly_payment": 2000}, "principal"),
+    ({"principal": True, "annual_rate": 6.0, "monthly_payment": 2000}, "principal"),
+])
+def test_bad_requests_are_rejected(body, message):
+    [(status, response)], _ = run(("POST", "/term", body))
+    assert status == 400
+    assert message in response["error"]
+
+
+def test_out_of_limits_row_does_not_fail_its_batch():
+    # Both requests join one batch; only the loan that cannot be priced to
+    # the cent fails
+    huge = {"principal": 1e11, "annual_rate": 60.0, "term_months": 1200}
+    (bad, good), app = run(("POST", "/payment", huge), ("POST", "/payment", LOAN), max_delay=0.05)
+    assert app.batchers["payment"].batches == 1
+    assert bad[0] == 422
+    assert "error" in bad[1]
+    assert good[0] == 200
+    assert good[1]["months"] == 360
+
+
+def test_term_beyond_the_limit_is_rejected():
+    [(status, response)], _ = run(("POST", "/payment", {**LOAN, "term_months": 100000}))
+    assert status == 400
+    assert "term_months" in response["error"]
+
+
+def test_schedule_round_trip():
+    [(status, body)], _ = run(("POST", "/schedule", {**LOAN, "extra_payment": 100, "start_date": "2024-01-31"}))
+    assert status == 200
+    schedule = body["schedule"]
+    assert len(schedule["Payment #"]) == body["months"]
+    assert schedule["Date"][:2] == ["2024-02-29", "2024-03-31"]
+    assert schedule["Remaining Balance"][-1] == 0
+    assert sum(schedule["Principal"]) == pytest.approx(250000, abs=0.01 * body["months"])
+    assert body["total_interest"] == pytest.approx(sum(schedule["Interest"]), abs=0.01)
+
+
+def test_unknown_endpoint_and_health():
+    (missing, health), _ = run(("POST", "/nope", LOAN), ("GET", "/healthz"))
+    assert missing[0] == 404
+    assert health == (200, {"status": "ok"})
+
+
+def test_batch_failure_is_retried_per_request():
+    def price(requests):
+        if any(params["bad"] for params in requests):
+            raise ArithmeticError("cannot price")
+        return [{"value": params["value"]} for params in requests]
+
+    batcher = MicroBatcher("test", price, max_delay=0.05)
+
+    async def main():
+        try:
+            return await asyncio.gather(
+                batcher.submit({"bad": True, "value": 1}),
+                batcher.submit({"bad": False, "value": 2}),
+                return_exceptions=True,
+            )
+        finally:
+            batcher.close()
+
+    bad, good = asyncio.run(main())
+    assert isinstance(bad, ArithmeticError)
+    assert good == {"value": 2}
+    assert batcher.batches == 1
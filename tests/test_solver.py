@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from loancore import payoff_periods, solve_payment, solve_rate, solve_term
+from loancore.solver import _payment_and_slope
+
+
+@pytest.mark.parametrize("principal,annual_rate,months", [
+    (250000, 5.5, 360),
+    (300000, 6.0, 360),
+    (18000, 7.9, 60),
+    (1000, 29.99, 12),
+    (500000, 0.25, 480),
+    (50000, 1e-6, 120),
+    (1000000, 60.0, 24),
+    (5000, 3.0, 1),
+])
+def test_solve_rate_round_trip(principal, annual_rate, months):
+    payment = solve_payment(principal, annual_rate, months)
+    assert solve_rate(principal, payment, months) == pytest.approx(annual_rate, rel=1e-9, abs=1e-9)
+
+
+def test_solve_rate_vectorized():
+    rng = np.random.default_rng(5)
+    principals = rng.uniform(1000, 1e6, 500)
+    rates = rng.uniform(0, 25, 500)
+    rates[:10] = 0
+    months = rng.choice([12, 60, 180, 360, 480], 500)
+    payments = solve_payment(principals, rates, months)
+    solved = solve_rate(principals, payments, months)
+    assert solved.shape == (500,)
+    np.testing.assert_allclose(solved, rates, rtol=1e-9, atol=1e-9)
+
+
+def test_zero_rate():
+    # Payments that add up to exactly the principal are interest-free
+    assert solve_rate(12000, 250, 48) == 0.0
+    assert solve_payment(12000, 0.0, 48) == 250
+
+
+def test_payments_below_the_principal_are_rejected():
+    with pytest.raises(ValueError):
+        solve_rate(12000, 249, 48)
+    with pytest.raises(ValueError):
+        solve_rate([12000, 12000], [300, 200], 48)
+
+
+def test_payment_and_slope_limits_at_zero_rate():
+    # The r -> 0 limits continue the closed form smoothly
+    principal, months = 100000.0, 360.0
+    value, slope = _payment_and_slope(principal, np.array([0.0, 1e-7]), months)
+    assert value[0] == pytest.approx(principal / months)
+    assert value[1] == pytest.approx(value[0], rel=1e-4)
+    assert slope[0] == pytest.approx(principal * (months + 1) / (2 * months))
+    assert slope[1] == pytest.approx(slope[0], rel=1e-3)
+
+
+def test_payment_slope_matches_finite_difference():
+    rates = np.array([0.001, 0.005, 0.02])
+    value, slope = _payment_and_slope(250000.0, rates, 360.0)
+    h = 1e-7
+    numeric = (_payment_and_slope(250000.0, rates + h, 360.0)[0] - _payment_and_slope(250000.0, rates - h, 360.0)[0]) / (2 * h)
+    np.testing.assert_allclose(slope, numeric, rtol=1e-5)
+
+
+def test_solve_term_round_trip():
+    payment = solve_payment(250000, 5.5, 360)
+    months, _ = solve_term(250000, 5.5, payment)
+    assert months == 360
+    with pytest.raises(ValueError):
+        payoff_periods(250000, 0.06 / 12, 1250)